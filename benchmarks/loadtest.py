@@ -0,0 +1,388 @@
+"""
+Offline load test for the `itweet github` pipeline.
+
+Starts one local stand-in server (in a separate process) that serves the
+GitHub Trending page, the GitHub REST API, raw.githubusercontent and
+OpenRouter chat completions, with configurable latency, error rates, 429s
+and payload sizes. The real Pipeline then runs against it and the script
+reports throughput, p50/p95/p99 latency per stage and peak memory.
+
+Usage:
+    python benchmarks/loadtest.py --candidates 300 --pick 40 --runs 3
+"""
+import argparse
+import base64
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import random
+import re
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+from itweet.core.ai_service import AIService
+from itweet.core.fetch_service import FetchService
+from itweet.core.pipeline import Pipeline, PipelineConfig, PipelineError
+from itweet.core.readme_service import ReadmeService
+
+
+# ---------------------------------------------------------------------------
+# Stand-in upstreams
+# ---------------------------------------------------------------------------
+
+
+def _trending_html(candidates: int) -> bytes:
+    rows = []
+    for i in range(1, candidates + 1):
+        rows.append(
+            '<article class="Box-row">'
+            f'<h2><a href="/owner{i}/repo{i}">owner{i} / repo{i}</a></h2>'
+            f'<p class="col-9 color-fg-muted my-1 pr-4">Tool number {i} that does useful thing {i}</p>'
+            '<span itemprop="programmingLanguage">Python</span>'
+            f'<a href="/owner{i}/repo{i}/stargazers">{1000 + i * 7:,}</a>'
+            f'<span class="d-inline-block float-sm-right">{10 + i} stars today</span>'
+            "</article>"
+        )
+    return ("<html><body>" + "".join(rows) + "</body></html>").encode("utf-8")
+
+
+def _readme_body(size: int) -> bytes:
+    line = b"This project does things. | col | col | <div>html</div>\n"
+    return (line * (size // len(line) + 1))[:size]
+
+
+def _tweet(thread: bool) -> str:
+    tweet = (
+        "Shipping faster with fewer moving parts.\n"
+        "https://github.com/owner/repo\n"
+        "> Small API\n"
+        "> Works offline"
+    )
+    return json.dumps([tweet, tweet]) if thread else tweet
+
+
+class _QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients closing early (streamed READMEs, timeouts) are expected.
+        pass
+
+
+def _serve(args, port_queue) -> None:
+    rng = random.Random(args.seed)
+    rng_lock = threading.Lock()
+    trending = _trending_html(args.candidates)
+    readme = _readme_body(args.readme_bytes)
+    readme_b64 = base64.encodebytes(readme).decode("ascii")
+
+    def readme_json(download_url: str) -> bytes:
+        return json.dumps(
+            {
+                "type": "file",
+                "encoding": "base64",
+                "size": len(readme),
+                "name": "README.md",
+                "path": "README.md",
+                "content": readme_b64,
+                "download_url": download_url,
+            }
+        ).encode()
+    latencies = {
+        "github": args.latency_github,
+        "raw": args.latency_raw,
+        "openrouter": args.latency_ai,
+    }
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *_):
+            pass
+
+        def _fault(self, upstream: str) -> int:
+            with rng_lock:
+                delay = rng.lognormvariate(math.log(max(latencies[upstream], 0.001)), args.jitter)
+                roll = rng.random()
+            time.sleep(delay / 1000.0)
+            if roll < args.error_rate:
+                return 500
+            if roll < args.error_rate + args.rate_limit_rate:
+                return 429
+            return 200
+
+        def _send(self, status: int, body: bytes, content_type: str) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                # Streaming README reads stop early and close the connection.
+                self.close_connection = True
+
+        def do_GET(self):
+            path = self.path.split("?", 1)[0]
+            if path.startswith("/trending"):
+                upstream, body, ctype = "github", trending, "text/html; charset=utf-8"
+            elif path.startswith("/api/repos/") and path.endswith("/readme"):
+                # Same shapes as GitHub: the raw media type returns the file,
+                # the default JSON form inlines all of it as base64.
+                if "vnd.github.raw" in self.headers.get("Accept", ""):
+                    upstream, body, ctype = "github", readme, "application/vnd.github.raw; charset=utf-8"
+                else:
+                    owner, repo = path.split("/")[3:5]
+                    download = f"http://127.0.0.1:{self.server.server_port}/raw/{owner}/{repo}/main/README.md"
+                    upstream, body, ctype = "github", readme_json(download), "application/json; charset=utf-8"
+            elif path.startswith("/raw/"):
+                upstream, body, ctype = "raw", readme, "text/plain; charset=utf-8"
+            else:
+                self._send(404, b"not found", "text/plain")
+                return
+            status = self._fault(upstream)
+            self._send(status, body if status == 200 else b"error", ctype)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            status = self._fault("openrouter")
+            if status != 200:
+                self._send(status, b'{"error": "upstream"}', "application/json")
+                return
+
+            messages = payload.get("messages", [])
+            prompt = messages[-1]["content"] if messages else ""
+            match = re.search(r"Pick the top (\d+)", prompt)
+            if match:
+                content = json.dumps([{"id": i, "reason": "load test"} for i in range(1, int(match.group(1)) + 1)])
+            else:
+                content = _tweet(thread="JSON array" in prompt)
+            prompt_tokens = sum(len(json.dumps(m)) for m in messages) // 4
+            body = {
+                "choices": [{"message": {"role": "assistant", "content": content}}],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": len(content) // 4,
+                    "prompt_tokens_details": {"cached_tokens": 0},
+                },
+            }
+            self._send(200, json.dumps(body).encode(), "application/json")
+
+    server = _QuietServer(("127.0.0.1", 0), Handler)
+    port_queue.put(server.server_port)
+    server.serve_forever()
+
+
+# ---------------------------------------------------------------------------
+# Instrumented services
+# ---------------------------------------------------------------------------
+
+
+class StageTimer:
+    def __init__(self) -> None:
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def timed(self, stage: str, fn, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            with self._lock:
+                self.errors[stage] += 1
+            raise
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000.0
+            with self._lock:
+                self.samples[stage].append(elapsed)
+
+
+class TimedFetch:
+    def __init__(self, inner: FetchService, timer: StageTimer) -> None:
+        self.inner = inner
+        self.timer = timer
+
+    def fetch_github_trending(self, **kwargs):
+        return self.timer.timed("fetch", self.inner.fetch_github_trending, **kwargs)
+
+
+class TimedReadme:
+    def __init__(self, inner: ReadmeService, timer: StageTimer) -> None:
+        self.inner = inner
+        self.timer = timer
+
+    def fetch_readme(self, repo_url: str, max_chars: int = 12_000) -> str:
+        return self.timer.timed("readme", self.inner.fetch_readme, repo_url, max_chars=max_chars)
+
+
+class TimedAI:
+    def __init__(self, inner: AIService, timer: StageTimer) -> None:
+        self.inner = inner
+        self.timer = timer
+
+    def generate_text(self, prompt: str, system=None, json_schema=None) -> str:
+        if system:
+            stage = "generate"
+        elif "Repos JSON" in prompt:
+            stage = "select"
+        else:
+            stage = "repair"
+        return self.timer.timed(stage, self.inner.generate_text, prompt, system=system, json_schema=json_schema)
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, math.ceil(pct / 100.0 * len(ordered)) - 1)
+    return ordered[rank]
+
+
+def run(args) -> dict:
+    os.environ["NO_PROXY"] = "127.0.0.1,localhost"
+    port_queue: multiprocessing.Queue = multiprocessing.Queue()
+    server = multiprocessing.Process(target=_serve, args=(args, port_queue), daemon=True)
+    server.start()
+    base = f"http://127.0.0.1:{port_queue.get(timeout=10)}"
+
+    timer = StageTimer()
+    ai = AIService(api_key="loadtest", api_url=f"{base}/api/v1/chat/completions")
+    pipeline = Pipeline(
+        ai_client=TimedAI(ai, timer),
+        fetch_service=TimedFetch(FetchService(base_url=f"{base}/trending"), timer),
+        readme_service=TimedReadme(
+            ReadmeService(api_base_url=f"{base}/api", raw_base_url=f"{base}/raw"),
+            timer,
+        ),
+    )
+    config = PipelineConfig(
+        limit=args.candidates,
+        pick=args.pick,
+        readme_chars=args.readme_chars,
+        record_history=False,
+        allow_repeats=True,
+        thread=args.thread,
+        concurrency=args.concurrency,
+        queue_size=args.queue_size,
+    )
+
+    if args.tracemalloc:
+        tracemalloc.start()
+
+    runs = []
+    events: Counter = Counter()
+    try:
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            try:
+                result = asyncio.run(pipeline.run(config, on_event=lambda e: events.update([e.kind])))
+                drafts, error = len(result.drafts), ""
+            except PipelineError as exc:
+                drafts, error = 0, str(exc)
+            runs.append({"seconds": time.perf_counter() - start, "drafts": drafts, "error": error})
+    finally:
+        server.terminate()
+
+    total_seconds = sum(r["seconds"] for r in runs)
+    total_drafts = sum(r["drafts"] for r in runs)
+    report = {
+        "config": {
+            "candidates": args.candidates,
+            "pick": args.pick,
+            "runs": args.runs,
+            "concurrency": args.concurrency,
+            "readme_bytes": args.readme_bytes,
+            "error_rate": args.error_rate,
+            "rate_limit_rate": args.rate_limit_rate,
+        },
+        "runs": runs,
+        "throughput_drafts_per_s": total_drafts / total_seconds if total_seconds else 0.0,
+        "stages": {
+            stage: {
+                "count": len(values),
+                "errors": timer.errors.get(stage, 0),
+                "p50_ms": _percentile(values, 50),
+                "p95_ms": _percentile(values, 95),
+                "p99_ms": _percentile(values, 99),
+            }
+            for stage, values in sorted(timer.samples.items())
+        },
+        "events": dict(events),
+        # ru_maxrss is KiB on Linux, bytes on macOS.
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024),
+        "tokens": {
+            "prompt": ai.usage.prompt_tokens,
+            "completion": ai.usage.completion_tokens,
+        },
+    }
+    if args.tracemalloc:
+        report["peak_python_heap_mb"] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+    return report
+
+
+def _print_report(report: dict) -> None:
+    cfg = report["config"]
+    print(
+        f"iTweet load test: {cfg['candidates']} candidates, {cfg['pick']} picks, "
+        f"{cfg['runs']} run(s), concurrency {cfg['concurrency']}\n"
+    )
+    for idx, r in enumerate(report["runs"], start=1):
+        status = f"error: {r['error']}" if r["error"] else f"{r['drafts']} drafts"
+        print(f"run {idx}: {r['seconds']:.2f}s, {status}")
+    print(f"\nthroughput: {report['throughput_drafts_per_s']:.2f} drafts/s\n")
+    print(f"{'stage':<10}{'count':>7}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for stage, s in report["stages"].items():
+        print(f"{stage:<10}{s['count']:>7}{s['errors']:>8}{s['p50_ms']:>10.1f}{s['p95_ms']:>10.1f}{s['p99_ms']:>10.1f}")
+    print(f"\nevents: {report['events']}")
+    print(f"peak RSS: {report['peak_rss_mb']:.1f} MB")
+    if "peak_python_heap_mb" in report:
+        print(f"peak Python heap: {report['peak_python_heap_mb']:.1f} MB")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=200, help="Repos on the fake Trending page")
+    parser.add_argument("--pick", type=int, default=30, help="Repos the fake AI selects")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=4, help="PipelineConfig.concurrency")
+    parser.add_argument("--queue-size", type=int, default=8, help="PipelineConfig.queue_size")
+    parser.add_argument("--thread", action="store_true", help="Generate threads instead of single tweets")
+    parser.add_argument("--readme-bytes", type=int, default=200_000, help="README payload size")
+    parser.add_argument("--readme-chars", type=int, default=6000, help="README character budget")
+    parser.add_argument("--latency-github", type=float, default=80.0, help="Median GitHub latency (ms)")
+    parser.add_argument("--latency-raw", type=float, default=40.0, help="Median raw README latency (ms)")
+    parser.add_argument("--latency-ai", type=float, default=600.0, help="Median OpenRouter latency (ms)")
+    parser.add_argument("--jitter", type=float, default=0.5, help="Lognormal sigma for all latencies")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--tracemalloc", action="store_true", help="Also report peak Python heap (slower)")
+    parser.add_argument("--json", dest="json_output", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    if args.json_output:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
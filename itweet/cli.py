@@ -3,54 +3,88 @@ Command-line interface for iTweet.
 
 Initial CLI skeleton with a GitHub Trending command placeholder.
 """
+import asyncio
 import sys
+from datetime import datetime, timezone
 from typing import Optional
 
 import click
 
-from .core.ai_service import AIService, AIServiceError
-from .core.fetch_service import FetchService, FetchServiceError
-from .core.readme_service import ReadmeService, ReadmeServiceError
-from .core.prompt_service import PromptService, TweetRequest
+from .core.ai_service import AIService
+from .core.bulk_service import BulkResult, BulkService, BulkServiceError
+from .core.history_service import HistoryService, HistoryServiceError
 from .core.output_writer import OutputWriter, OutputWriterError
-from .core.selector_service import SelectorService, SelectorServiceError
-
-
-def _normalize_tweet_language(raw: str) -> str:
-    normalized = (raw or "").strip()
-    if not normalized:
-        return "English"
-    key = normalized.lower()
-    aliases = {
-        "en": "English",
-        "english": "English",
-        "id": "Indonesian",
-        "indo": "Indonesian",
-        "indonesia": "Indonesian",
-        "indonesian": "Indonesian",
-        "bahasa indonesia": "Indonesian",
-        "ms": "Malay",
-        "malay": "Malay",
-        "melayu": "Malay",
-        "malaysia": "Malay",
-        "malasyia": "Malay",
-        "es": "Spanish",
-        "spanish": "Spanish",
-        "fr": "French",
-        "french": "French",
-        "de": "German",
-        "german": "German",
-        "ja": "Japanese",
-        "japanese": "Japanese",
-        "jp": "Japanese",
-        "ko": "Korean",
-        "korean": "Korean",
-        "zh": "Chinese",
-        "chinese": "Chinese",
-        "pt": "Portuguese",
-        "portuguese": "Portuguese",
-    }
-    return aliases.get(key, normalized)
+from .core.pipeline import Pipeline, PipelineConfig, PipelineError, PipelineEvent
+from .core.prompt_service import normalize_output_language
+from .core.queue_service import JobQueue, QueueServiceError, QueueWorker
+from .core.server import DraftServer, pooled_session
+
+
+def _prompt_ai_service(prompt_cache: bool = False, session=None) -> Optional[AIService]:
+    ai_service = AIService(prompt_cache=prompt_cache, session=session)
+    if ai_service.validate_api_key():
+        return ai_service
+    click.echo("\n🔑 iTweet requires an OpenRouter API key.")
+    click.echo("Get your key at: https://openrouter.ai/keys")
+    try:
+        user_key = input("\nPlease enter your OpenRouter API key: ").strip()
+    except (EOFError, KeyboardInterrupt):
+        click.echo("\n⚠️  Action cancelled.")
+        return None
+    if not user_key:
+        click.echo("❌ Error: No API key provided.")
+        return None
+    ai_service = AIService(api_key=user_key, prompt_cache=prompt_cache, session=session)
+    ai_service.config_manager.save_api_key(user_key)
+    return ai_service
+
+
+def _echo_usage(ai_service: AIService) -> None:
+    usage = ai_service.usage
+    if not usage.requests:
+        return
+    click.echo(
+        f"Tokens: {usage.prompt_tokens} prompt ({usage.cached_tokens} cached), "
+        f"{usage.completion_tokens} completion over {usage.requests} request(s)."
+    )
+
+
+def _echo_event(event: PipelineEvent) -> None:
+    if event.kind == "notice":
+        click.echo(f"\n{event.message}")
+    elif event.kind == "warning":
+        click.echo(f"⚠️  {event.message}")
+    elif event.kind == "trending":
+        click.echo("\nTrending repositories:\n")
+        for idx, repo in enumerate(event.data, start=1):
+            stars_today = f" (+{repo.stars_today} today)" if repo.stars_today else ""
+            desc = repo.description or "-"
+            click.echo(f"{idx}. {repo.name} [{repo.language}]")
+            click.echo(f"   {repo.url}")
+            click.echo(f"   ⭐ {repo.stars}{stars_today}")
+            click.echo(f"   {desc}\n")
+    elif event.kind == "skipped":
+        names = ", ".join(r.name for r in event.data)
+        click.echo(f"Skipping {len(event.data)} repo(s) already covered recently: {names}")
+    elif event.kind == "selected":
+        click.echo("\nAI selected:\n")
+        for idx, repo in enumerate(event.data, start=1):
+            click.echo(f"{idx}. {repo.name}")
+            click.echo(f"   {repo.url}")
+            click.echo(f"   reason: {repo.reason}\n")
+        click.echo("Fetching READMEs (for context / to reduce misinformation) and generating drafts:\n")
+    elif event.kind == "readme":
+        click.echo(f"- {event.repo}: README fetched: {event.data} chars")
+    elif event.kind == "readme_failed":
+        click.echo(f"- {event.repo}: README fetch failed: {event.message}")
+    elif event.kind == "draft":
+        click.echo(f"\n- {event.repo}\n{event.data}\n")
+        if event.message:
+            click.echo(f"⚠️  {event.message}\n")
+    elif event.kind == "draft_failed":
+        click.echo(f"❌ Failed to generate tweet for {event.repo}: {event.message}")
+    elif event.kind == "draft_skipped":
+        click.echo(f"⏭️  Skipping {event.repo}: {event.message}")
 
 
 @click.group(context_settings={"help_option_names": ["-h", "--help"]})
@@ -96,6 +130,13 @@ def main():
     show_default=True,
     help="How many repos the AI should pick",
 )
+@click.option(
+    "--chunk-size",
+    type=int,
+    default=40,
+    show_default=True,
+    help="Above this many candidates, AI selection runs as a tournament over chunks (0 = single prompt)",
+)
 @click.option(
     "--readme-chars",
     type=int,
@@ -103,6 +144,32 @@ def main():
     show_default=True,
     help="Max README characters to fetch per repo (0 = unlimited)",
 )
+@click.option(
+    "--rank-by",
+    type=click.Choice(["trending", "velocity", "acceleration"], case_sensitive=False),
+    default="trending",
+    show_default=True,
+    help="Order repos by trending position or by star momentum from saved history",
+)
+@click.option(
+    "--window",
+    type=int,
+    default=7,
+    show_default=True,
+    help="History window in days used by --rank-by",
+)
+@click.option(
+    "--no-history",
+    is_flag=True,
+    default=False,
+    help="Do not record this trending snapshot in local history",
+)
+@click.option(
+    "--allow-repeats",
+    is_flag=True,
+    default=False,
+    help="Do not skip repos and drafts similar to ones generated in the last 30 days",
+)
 @click.option(
     "--list-only",
     is_flag=True,
@@ -135,6 +202,12 @@ def main():
     show_default=True,
     help="Max characters per tweet",
 )
+@click.option(
+    "--prompt-cache",
+    is_flag=True,
+    default=False,
+    help="Mark the shared prompt prefix for provider caching (Anthropic/Gemini; needs a prefix over ~1024 tokens)",
+)
 @click.option(
     "--output",
     type=str,
@@ -153,18 +226,24 @@ def github(
     language: Optional[str],
     limit: int,
     pick: int,
+    chunk_size: int,
     readme_chars: int,
+    rank_by: str,
+    window: int,
+    no_history: bool,
+    allow_repeats: bool,
     list_only: bool,
     no_tweets: bool,
     thread: bool,
     tone: str,
     max_chars: int,
     tweet_language: str,
+    prompt_cache: bool,
     output: Optional[str],
     json_output: bool,
 ):
     """Fetch GitHub Trending, then (optionally) let AI pick top repos and fetch their READMEs."""
-    tweet_language = _normalize_tweet_language(tweet_language)
+    tweet_language = normalize_output_language(tweet_language)
 
     click.echo("iTweet: GitHub Trending")
     click.echo(f"- since: {since}")
@@ -173,125 +252,529 @@ def github(
 
     ai_service = None
     if not list_only:
-        ai_service = AIService()
-        if not ai_service.validate_api_key():
-            click.echo("\n🔑 iTweet requires an OpenRouter API key.")
-            click.echo("Get your key at: https://openrouter.ai/keys")
-            try:
-                user_key = input("\nPlease enter your OpenRouter API key: ").strip()
-                if user_key:
-                    ai_service = AIService(api_key=user_key)
-                    ai_service.config_manager.save_api_key(user_key)
-                else:
-                    click.echo("❌ Error: No API key provided.")
-                    return 1
-            except (EOFError, KeyboardInterrupt):
-                click.echo("\n⚠️  Action cancelled.")
-                return 1
-
-    service = FetchService()
+        ai_service = _prompt_ai_service(prompt_cache=prompt_cache)
+        if ai_service is None:
+            return 1
+
+    config = PipelineConfig(
+        since=since,
+        language=language,
+        limit=limit,
+        pick=pick,
+        select_chunk_size=chunk_size,
+        readme_chars=readme_chars,
+        rank_by=rank_by,
+        window=window,
+        record_history=not no_history,
+        allow_repeats=allow_repeats,
+        list_only=list_only,
+        no_tweets=no_tweets,
+        thread=thread,
+        tone=tone,
+        max_chars=max_chars,
+        tweet_language=tweet_language,
+    )
+    pipeline = Pipeline(ai_client=ai_service)
     try:
-        repos = service.fetch_github_trending(since=since, language=language)
-    except FetchServiceError as exc:
+        result = asyncio.run(pipeline.run(config, on_event=_echo_event))
+    except PipelineError as exc:
         click.echo(f"\nError: {exc}")
         return 1
 
-    if not repos:
-        click.echo("\nNo trending repositories found.")
+    if list_only or not result.repos:
         return 0
 
-    click.echo("\nTrending repositories:\n")
-    repos = repos[: max(1, limit)]
-    for idx, repo in enumerate(repos, start=1):
-        stars_today = f" (+{repo.stars_today} today)" if repo.stars_today else ""
-        desc = repo.description or "-"
-        click.echo(f"{idx}. {repo.name} [{repo.language}]")
-        click.echo(f"   {repo.url}")
-        click.echo(f"   ⭐ {repo.stars}{stars_today}")
-        click.echo(f"   {desc}\n")
-
-    if list_only:
+    _echo_usage(ai_service)
+
+    if no_tweets:
+        if result.selected:
+            click.echo("Tip: remove --no-tweets to generate tweet drafts.")
         return 0
 
-    pick = max(1, min(pick, len(repos)))
-    selector = SelectorService(ai_service)
-    try:
-        selected = selector.select_top_repos(repos, limit=pick)
-    except (SelectorServiceError, AIServiceError) as exc:
-        click.echo(f"\nError: failed to select repos via AI: {exc}")
-        return 1
+    if result.local_repairs or result.regenerations:
+        click.echo(
+            f"Validation: {result.local_repairs} draft(s) trimmed locally, "
+            f"{result.regenerations} repair request(s) sent.\n"
+        )
 
-    if not selected:
-        click.echo("\nAI did not select any repositories.")
-        return 1
+    drafts = result.drafts
+    if output or json_output:
+        output_writer = OutputWriter()
+        try:
+            if output:
+                path = output_writer.write_text(drafts, filename=output)
+                click.echo(f"Saved tweets to: {path}")
+            if json_output:
+                path = output_writer.write_json(drafts)
+                click.echo(f"Saved tweets to: {path}")
+        except OutputWriterError as exc:
+            click.echo(f"⚠️  Failed to write output: {exc}")
 
-    click.echo("\nAI selected:\n")
-    for idx, repo in enumerate(selected, start=1):
-        click.echo(f"{idx}. {repo.name}")
-        click.echo(f"   {repo.url}")
-        click.echo(f"   reason: {repo.reason}\n")
+    return 0
 
-    readme_service = ReadmeService()
-    prompt_service = PromptService()
-    output_writer = OutputWriter()
 
-    click.echo("Fetching READMEs (for context / to reduce misinformation):\n")
-    readme_map = {}
-    for repo in selected:
-        click.echo(f"- {repo.name}:")
-        try:
-            text = readme_service.fetch_readme(repo.url, max_chars=readme_chars)
-            readme_map[repo.name] = text
-            click.echo(f"  README fetched: {len(text)} chars\n")
-        except ReadmeServiceError as exc:
-            readme_map[repo.name] = ""
-            click.echo(f"  README fetch failed: {exc}\n")
+@main.command()
+@click.option(
+    "--input",
+    "input_path",
+    type=click.Path(exists=True, dir_okay=False),
+    required=True,
+    help="Text file with one repo URL (or owner/repo) per line",
+)
+@click.option(
+    "--checkpoint",
+    type=str,
+    default=None,
+    help="Checkpoint file (JSONL); defaults to <input>.checkpoint.jsonl",
+)
+@click.option(
+    "--concurrency",
+    type=int,
+    default=4,
+    show_default=True,
+    help="How many repos to process in parallel",
+)
+@click.option(
+    "--lang",
+    "tweet_language",
+    type=str,
+    default="English",
+    show_default=True,
+    help="Output language for generated tweets",
+)
+@click.option(
+    "--readme-chars",
+    type=int,
+    default=6000,
+    show_default=True,
+    help="Max README characters to fetch per repo (0 = unlimited)",
+)
+@click.option(
+    "--thread",
+    is_flag=True,
+    default=False,
+    help="Generate short thread (2-3 tweets) per repo instead of single tweet",
+)
+@click.option(
+    "--tone",
+    type=str,
+    default="informative",
+    show_default=True,
+    help="Tone for tweets (e.g., informative, casual, excited)",
+)
+@click.option(
+    "--max-chars",
+    type=int,
+    default=280,
+    show_default=True,
+    help="Max characters per tweet",
+)
+@click.option(
+    "--prompt-cache",
+    is_flag=True,
+    default=False,
+    help="Mark the shared prompt prefix for provider caching (Anthropic/Gemini; needs a prefix over ~1024 tokens)",
+)
+@click.option(
+    "--output",
+    type=str,
+    default=None,
+    help="Write all successful drafts to file (txt) when done",
+)
+def bulk(
+    input_path: str,
+    checkpoint: Optional[str],
+    concurrency: int,
+    tweet_language: str,
+    readme_chars: int,
+    thread: bool,
+    tone: str,
+    max_chars: int,
+    prompt_cache: bool,
+    output: Optional[str],
+):
+    """Generate tweet drafts for a list of repos, resuming from a checkpoint."""
+    tweet_language = normalize_output_language(tweet_language)
+    checkpoint = checkpoint or f"{input_path}.checkpoint.jsonl"
 
-    if no_tweets:
-        click.echo("Tip: remove --no-tweets to generate tweet drafts.")
-        return 0
+    ai_service = _prompt_ai_service(prompt_cache=prompt_cache)
+    if ai_service is None:
+        return 1
 
-    click.echo("Generating tweet drafts:\n")
-    drafts = []
-    for selected_repo in selected:
-        repo = next((r for r in repos if r.name == selected_repo.name), None)
-        if not repo:
-            continue
-        readme_text = readme_map.get(repo.name, "")
-        req = TweetRequest(
-            repo_name=repo.name,
-            repo_url=repo.url,
-            description=repo.description,
-            language=repo.language,
-            stars=repo.stars,
-            stars_today=repo.stars_today,
-            readme_text=readme_text,
+    click.echo("iTweet: bulk generation")
+    click.echo(f"- input: {input_path}")
+    click.echo(f"- checkpoint: {checkpoint}")
+    click.echo(f"- tweet language: {tweet_language}\n")
+
+    def report(result: BulkResult) -> None:
+        if result.status == "ok":
+            click.echo(f"- {result.name}\n{result.draft}\n")
+        else:
+            click.echo(f"❌ Failed to generate tweet for {result.name}: {result.error}")
+
+    service = BulkService(ai_service)
+    try:
+        processed = service.run(
+            BulkService.read_urls(input_path),
+            checkpoint_path=checkpoint,
+            concurrency=concurrency,
+            readme_chars=readme_chars,
+            on_result=report,
             output_language=tweet_language,
             tone=tone,
             max_chars=max_chars,
             thread=thread,
         )
-        prompt = prompt_service.build_tweet_prompt(req)
+    except BulkServiceError as exc:
+        click.echo(f"Error: {exc}")
+        return 1
+    except KeyboardInterrupt:
+        click.echo("\n⚠️  Interrupted. Re-run the same command to resume.")
+        return 1
+
+    click.echo(f"Processed {processed} repo(s) this run.")
+    _echo_usage(ai_service)
+
+    if output:
+        drafts = (e.draft for e in BulkService.iter_checkpoint(checkpoint) if e.status == "ok")
         try:
-            result = ai_service.generate_text(prompt)
-        except AIServiceError as exc:
-            click.echo(f"❌ Failed to generate tweet for {repo.name}: {exc}")
-            continue
-        drafts.append(result)
+            path = OutputWriter().write_text(drafts, filename=output)
+            click.echo(f"Saved tweets to: {path}")
+        except OutputWriterError as exc:
+            click.echo(f"⚠️  Failed to write output: {exc}")
+    return 0
 
-        click.echo(f"- {repo.name}\n{result}\n")
 
-    if output or json_output:
+@main.command()
+@click.option("--host", type=str, default="127.0.0.1", show_default=True, help="Address to bind")
+@click.option("--port", type=int, default=8787, show_default=True, help="Port to listen on")
+@click.option(
+    "--workers",
+    type=int,
+    default=8,
+    show_default=True,
+    help="Worker threads for upstream calls (fetch, README, AI)",
+)
+@click.option(
+    "--prompt-cache",
+    is_flag=True,
+    default=False,
+    help="Mark the shared prompt prefix for provider caching (Anthropic/Gemini; needs a prefix over ~1024 tokens)",
+)
+def serve(host: str, port: int, workers: int, prompt_cache: bool):
+    """Serve trending, selection and draft generation over a local HTTP API."""
+    workers = max(1, workers)
+    session = pooled_session(workers)
+    ai_service = _prompt_ai_service(prompt_cache=prompt_cache, session=session)
+    if ai_service is None:
+        return 1
+
+    app = DraftServer(ai_service, workers=workers, session=session)
+    try:
+        server = app.make_http_server(host=host, port=port)
+    except OSError as exc:
+        click.echo(f"Error: cannot listen on {host}:{port}: {exc}")
+        return 1
+
+    click.echo(f"iTweet: serving on http://{host}:{port}")
+    click.echo("- GET  /trending?since=daily&lang=python")
+    click.echo("- POST /select  {since, lang, limit, pick}")
+    click.echo("- POST /draft   {url, lang, tone, max_chars, thread, readme_chars}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        click.echo("\nShutting down.")
+    finally:
+        server.server_close()
+        app.work.shutdown()
+    return 0
+
+
+@main.command()
+@click.option("--db", type=str, default=None, help="Job database (default: ~/.itweet/jobs.db)")
+@click.option(
+    "--since",
+    type=click.Choice(["daily", "weekly", "monthly"], case_sensitive=False),
+    default="daily",
+    show_default=True,
+    help="Trending time range (for a trending fetch job)",
+)
+@click.option(
+    "--code-lang",
+    "language",
+    type=str,
+    default=None,
+    help="Filter by programming language (optional)",
+)
+@click.option(
+    "--limit",
+    type=int,
+    default=25,
+    show_default=True,
+    help="How many trending repos to consider",
+)
+@click.option(
+    "--pick",
+    type=int,
+    default=4,
+    show_default=True,
+    help="How many repos the AI should pick",
+)
+@click.option(
+    "--repo",
+    "repo_urls",
+    type=str,
+    multiple=True,
+    help="Enqueue README+draft jobs for this repo URL (or owner/repo) instead of a trending fetch; repeatable",
+)
+@click.option(
+    "--input",
+    "input_path",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help="Text file with one repo URL (or owner/repo) per line",
+)
+@click.option(
+    "--lang",
+    "tweet_language",
+    type=str,
+    default="English",
+    show_default=True,
+    help="Output language for generated tweets",
+)
+@click.option(
+    "--readme-chars",
+    type=int,
+    default=6000,
+    show_default=True,
+    help="Max README characters to fetch per repo",
+)
+@click.option(
+    "--thread",
+    is_flag=True,
+    default=False,
+    help="Generate short thread (2-3 tweets) per repo",
+)
+@click.option("--tone", type=str, default="informative", show_default=True, help="Tone for tweets")
+@click.option(
+    "--max-chars",
+    type=int,
+    default=280,
+    show_default=True,
+    help="Max characters per tweet",
+)
+@click.option(
+    "--max-attempts",
+    type=int,
+    default=3,
+    show_default=True,
+    help="Attempts per job before it is marked failed",
+)
+def enqueue(
+    db: Optional[str],
+    since: str,
+    language: Optional[str],
+    limit: int,
+    pick: int,
+    repo_urls,
+    input_path: Optional[str],
+    tweet_language: str,
+    readme_chars: int,
+    thread: bool,
+    tone: str,
+    max_chars: int,
+    max_attempts: int,
+):
+    """Add fetch/README/generate jobs to the durable queue for `itweet worker`."""
+    tweet = {
+        "output_language": normalize_output_language(tweet_language),
+        "tone": tone,
+        "max_chars": max_chars,
+        "thread": thread,
+        "readme_chars": readme_chars,
+    }
+    try:
+        queue = JobQueue(db)
+        urls = list(repo_urls)
+        if input_path:
+            urls = [*urls, *BulkService.read_urls(input_path)]
+        if urls:
+            for url in urls:
+                if "://" not in url:
+                    url = f"https://github.com/{url.strip('/')}"
+                queue.enqueue("readme", dict(tweet, url=url.rstrip("/")), max_attempts=max_attempts)
+            click.echo(f"Enqueued {len(urls)} repo job(s) in {queue.db_path}")
+        else:
+            payload = {"since": since, "language": language, "limit": limit, "pick": pick, "tweet": tweet}
+            job_id = queue.enqueue("fetch", payload, max_attempts=max_attempts)
+            click.echo(f"Enqueued trending fetch job #{job_id} in {queue.db_path}")
+    except (QueueServiceError, BulkServiceError) as exc:
+        click.echo(f"Error: {exc}")
+        return 1
+    return 0
+
+
+@main.command()
+@click.option("--db", type=str, default=None, help="Job database (default: ~/.itweet/jobs.db)")
+@click.option(
+    "--lease",
+    type=float,
+    default=120,
+    show_default=True,
+    help="Lease length in seconds (renewed by heartbeat)",
+)
+@click.option(
+    "--poll",
+    type=float,
+    default=2.0,
+    show_default=True,
+    help="Seconds to wait when the queue is empty",
+)
+@click.option(
+    "--retry-delay",
+    type=float,
+    default=5,
+    show_default=True,
+    help="Seconds before a failed job is retried (doubles per attempt, max 300)",
+)
+@click.option(
+    "--exit-when-empty",
+    is_flag=True,
+    default=False,
+    help="Stop once no runnable jobs are left",
+)
+@click.option(
+    "--prompt-cache",
+    is_flag=True,
+    default=False,
+    help="Mark the shared prompt prefix for provider caching (Anthropic/Gemini; needs a prefix over ~1024 tokens)",
+)
+def worker(
+    db: Optional[str],
+    lease: float,
+    poll: float,
+    retry_delay: float,
+    exit_when_empty: bool,
+    prompt_cache: bool,
+):
+    """Claim and run queued jobs. Start several to drain a backlog in parallel."""
+    ai_service = _prompt_ai_service(prompt_cache=prompt_cache)
+    if ai_service is None:
+        return 1
+
+    try:
+        queue = JobQueue(db, lease_seconds=lease, retry_delay=retry_delay)
+    except QueueServiceError as exc:
+        click.echo(f"Error: {exc}")
+        return 1
+    runner = QueueWorker(queue, ai_client=ai_service)
+    click.echo(f"iTweet worker {runner.worker_id} on {queue.db_path}")
+
+    def report(job, ok, error):
+        if ok:
+            click.echo(f"✓ #{job.id} {job.kind}")
+        else:
+            click.echo(f"❌ #{job.id} {job.kind} (attempt {job.attempts}/{job.max_attempts}): {error}")
+
+    try:
+        handled = runner.run(poll_seconds=poll, exit_when_empty=exit_when_empty, on_job=report)
+    except KeyboardInterrupt:
+        click.echo("\n⚠️  Stopped. Unfinished jobs are picked up again after their lease expires.")
+        return 1
+    except QueueServiceError as exc:
+        click.echo(f"Error: {exc}")
+        return 1
+    click.echo(f"Handled {handled} job(s).")
+    _echo_usage(ai_service)
+    return 0
+
+
+@main.command()
+@click.option("--db", type=str, default=None, help="Job database (default: ~/.itweet/jobs.db)")
+@click.option("--drafts", "show_drafts", is_flag=True, default=False, help="Print finished drafts")
+@click.option("--output", type=str, default=None, help="Write finished drafts to file (txt)")
+def jobs(db: Optional[str], show_drafts: bool, output: Optional[str]):
+    """Show job queue progress and finished drafts."""
+    try:
+        queue = JobQueue(db)
+    except QueueServiceError as exc:
+        click.echo(f"Error: {exc}")
+        return 1
+
+    counts = queue.counts()
+    if not counts:
+        click.echo("No jobs queued.")
+        return 0
+    for kind in ("fetch", "readme", "generate"):
+        if kind in counts:
+            summary = ", ".join(f"{status}: {n}" for status, n in sorted(counts[kind].items()))
+            click.echo(f"{kind:<9} {summary}")
+
+    if show_drafts:
+        for result in queue.results("generate"):
+            click.echo(f"\n- {result['repo']}\n{result['draft']}")
+    if output:
         try:
-            if output:
-                path = output_writer.write_text(drafts, filename=output)
-                click.echo(f"Saved tweets to: {path}")
-            if json_output:
-                path = output_writer.write_json(drafts)
-                click.echo(f"Saved tweets to: {path}")
+            path = OutputWriter().write_text((r["draft"] for r in queue.results("generate")), filename=output)
+            click.echo(f"Saved tweets to: {path}")
         except OutputWriterError as exc:
             click.echo(f"⚠️  Failed to write output: {exc}")
+    return 0
+
+
+@main.command()
+@click.option(
+    "--since",
+    type=click.Choice(["daily", "weekly", "monthly"], case_sensitive=False),
+    default="daily",
+    show_default=True,
+    help="Trending time range the snapshots were recorded for",
+)
+@click.option(
+    "--window",
+    type=int,
+    default=7,
+    show_default=True,
+    help="History window in days",
+)
+@click.option(
+    "--sort",
+    type=click.Choice(["velocity", "acceleration", "days"], case_sensitive=False),
+    default="velocity",
+    show_default=True,
+    help="Ranking signal",
+)
+@click.option(
+    "--limit",
+    type=int,
+    default=25,
+    show_default=True,
+    help="How many repos to show",
+)
+def history(since: str, window: int, sort: str, limit: int):
+    """Rank repos by star momentum from recorded trending snapshots."""
+    try:
+        stats = HistoryService().momentum(window_days=window, since=since)
+    except HistoryServiceError as exc:
+        click.echo(f"Error: {exc}")
+        return 1
+
+    if not stats:
+        click.echo("No trending history recorded for this window yet.")
+        return 0
+
+    sort = sort.lower()
+    if sort == "days":
+        stats.sort(key=lambda m: (m.days_on_trending, m.velocity), reverse=True)
+    else:
+        stats.sort(key=lambda m: getattr(m, sort), reverse=True)
 
+    click.echo(f"iTweet: trending momentum (last {window} days, {since})\n")
+    for idx, m in enumerate(stats[: max(1, limit)], start=1):
+        first_seen = datetime.fromtimestamp(m.first_seen * 86400, tz=timezone.utc).strftime("%Y-%m-%d")
+        click.echo(f"{idx}. {m.name}")
+        click.echo(f"   ⭐ {m.stars}  velocity {m.velocity:+.1f}/day  acceleration {m.acceleration:+.1f}/day²")
+        click.echo(f"   {m.days_on_trending} day(s) on trending, first seen {first_seen}\n")
     return 0
 
 
@@ -2,10 +2,11 @@
 Service for AI-driven selection and tweet generation using OpenRouter.
 """
 import os
-import json
+import threading
+from dataclasses import dataclass
 from typing import Optional
-import urllib.request
-import urllib.error
+
+import requests
 
 from .config_manager import ConfigManager
 
@@ -14,22 +15,56 @@ class AIServiceError(Exception):
     """Exception raised when AI service fails."""
 
 
+OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+# Model prefixes on OpenRouter that accept explicit `cache_control` breakpoints.
+# Others (OpenAI, DeepSeek, ...) cache long prefixes automatically.
+CACHE_CONTROL_MODEL_PREFIXES = ("anthropic/", "google/gemini")
+
+# Model prefixes on OpenRouter that honour `response_format: json_schema`.
+STRUCTURED_OUTPUT_MODEL_PREFIXES = ("openai/", "google/gemini")
+
+
+@dataclass
+class TokenUsage:
+    requests: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+
+
 class AIService:
     """Handles AI calls via OpenRouter."""
 
-    def __init__(self, api_key: Optional[str] = None, model: str = "google/gemini-2.5-flash"):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = "google/gemini-2.5-flash",
+        prompt_cache: bool = False,
+        api_url: str = OPENROUTER_API_URL,
+        session: Optional[requests.Session] = None,
+    ):
         """
         Initialize AIService.
 
         Args:
             api_key: OpenRouter API key. If None, tries env or local config.
             model: OpenRouter model name.
+            prompt_cache: Mark the system prompt with `cache_control` when the
+                model supports explicit caching.
+            api_url: Chat completions endpoint.
+            session: Optional requests.Session, so long-running callers can
+                reuse TLS connections to OpenRouter.
         """
         self.config_manager = ConfigManager()
         raw_key = api_key or self._get_api_key_from_env() or self.config_manager.get_api_key()
         self.api_key = self._normalize_api_key(raw_key)
         self.model = model
-        self.api_url = "https://openrouter.ai/api/v1/chat/completions"
+        self.prompt_cache = prompt_cache
+        self.api_url = api_url
+        self.http = session or requests
+        self.usage = TokenUsage()
+        self._usage_lock = threading.Lock()
 
     def _get_api_key_from_env(self) -> Optional[str]:
         env_vars = [
@@ -54,12 +89,28 @@ class AIService:
     def validate_api_key(self) -> bool:
         return self.api_key is not None and len(self.api_key) > 0
 
-    def generate_text(self, prompt: str) -> str:
+    def supports_cache_control(self) -> bool:
+        return self.model.startswith(CACHE_CONTROL_MODEL_PREFIXES)
+
+    def supports_structured_output(self) -> bool:
+        return self.model.startswith(STRUCTURED_OUTPUT_MODEL_PREFIXES)
+
+    def generate_text(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        json_schema: Optional[dict] = None,
+    ) -> str:
         """
         Generate text using OpenRouter.
 
         Args:
             prompt: The prompt to send.
+            system: Optional static instructions sent as a separate system
+                message, so providers can cache it across requests.
+            json_schema: Optional JSON schema for the reply. Sent as a strict
+                `response_format` when the model supports it; otherwise the
+                prompt alone has to ask for JSON.
 
         Returns:
             Response content.
@@ -70,9 +121,40 @@ class AIService:
                 "or provide it via CLI when implemented."
             )
 
-        return self._call_openrouter_api(prompt)
-
-    def _call_openrouter_api(self, prompt: str) -> str:
+        response_format = None
+        if json_schema and self.supports_structured_output():
+            response_format = {
+                "type": "json_schema",
+                "json_schema": {"name": "response", "strict": True, "schema": json_schema},
+            }
+        return self._call_openrouter_api(prompt, system=system, response_format=response_format)
+
+    def _build_messages(self, prompt: str, system: Optional[str]) -> list:
+        messages = []
+        if system:
+            if self.prompt_cache and self.supports_cache_control():
+                content = [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]
+                messages.append({"role": "system", "content": content})
+            else:
+                messages.append({"role": "system", "content": system})
+        messages.append({"role": "user", "content": prompt})
+        return messages
+
+    def _record_usage(self, usage: Optional[dict]) -> None:
+        usage = usage or {}
+        details = usage.get("prompt_tokens_details") or {}
+        with self._usage_lock:
+            self.usage.requests += 1
+            self.usage.prompt_tokens += int(usage.get("prompt_tokens") or 0)
+            self.usage.completion_tokens += int(usage.get("completion_tokens") or 0)
+            self.usage.cached_tokens += int(details.get("cached_tokens") or 0)
+
+    def _call_openrouter_api(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        response_format: Optional[dict] = None,
+    ) -> str:
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
@@ -82,29 +164,30 @@ class AIService:
 
         data = {
             "model": self.model,
-            "messages": [
-                {"role": "user", "content": prompt},
-            ],
+            "messages": self._build_messages(prompt, system),
+            "usage": {"include": True},
         }
+        if response_format:
+            data["response_format"] = response_format
 
         try:
-            req = urllib.request.Request(
-                self.api_url,
-                data=json.dumps(data).encode("utf-8"),
-                headers=headers,
-                method="POST",
-            )
-            with urllib.request.urlopen(req, timeout=60) as response:
-                result = json.loads(response.read().decode("utf-8"))
-
-            if "choices" in result and result["choices"]:
-                content = result["choices"][0]["message"]["content"]
-                return content.strip()
-            raise AIServiceError("Unexpected API response format")
-        except urllib.error.HTTPError as exc:
-            error_body = exc.read().decode("utf-8")
-            raise AIServiceError(f"API request failed (HTTP {exc.code}): {error_body}") from exc
-        except urllib.error.URLError as exc:
+            r = self.http.post(self.api_url, json=data, headers=headers, timeout=60)
+        except requests.RequestException as exc:
             raise AIServiceError(f"Network error: {str(exc)}") from exc
-        except json.JSONDecodeError as exc:
+
+        if r.status_code != 200:
+            if r.status_code == 400 and response_format:
+                # Some providers behind a model reject json_schema; fall back to a plain request.
+                return self._call_openrouter_api(prompt, system=system)
+            raise AIServiceError(f"API request failed (HTTP {r.status_code}): {r.text}")
+
+        try:
+            result = r.json()
+        except ValueError as exc:
             raise AIServiceError(f"Failed to parse API response: {str(exc)}") from exc
+
+        self._record_usage(result.get("usage"))
+        if "choices" in result and result["choices"]:
+            content = result["choices"][0]["message"]["content"]
+            return content.strip()
+        raise AIServiceError("Unexpected API response format")
@@ -0,0 +1,207 @@
+"""Bulk tweet generation over a list of repo URLs, with checkpoint/resume."""
+from __future__ import annotations
+
+import json
+import os
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from typing import Callable, Iterable, Iterator, Optional, Set
+
+from .ai_service import AIServiceError
+from .fetch_service import FetchService, FetchServiceError
+from .prompt_service import PromptService, TweetRequest
+from .readme_service import ReadmeService, ReadmeServiceError
+from .tweet_validator import TweetValidator
+
+
+class BulkServiceError(RuntimeError):
+    pass
+
+
+@dataclass
+class BulkResult:
+    url: str
+    name: str
+    status: str
+    draft: str = ""
+    error: str = ""
+
+
+class BulkService:
+    def __init__(
+        self,
+        ai_client,
+        fetch_service: Optional[FetchService] = None,
+        readme_service: Optional[ReadmeService] = None,
+        prompt_service: Optional[PromptService] = None,
+    ) -> None:
+        """
+        ai_client must expose:
+            generate_text(prompt: str, system: Optional[str] = None, json_schema: Optional[dict] = None) -> str
+        """
+        self.ai_client = ai_client
+        self.fetch_service = fetch_service or FetchService()
+        self.readme_service = readme_service or ReadmeService()
+        self.prompt_service = prompt_service or PromptService()
+
+    def run(
+        self,
+        urls: Iterable[str],
+        checkpoint_path: str,
+        concurrency: int = 4,
+        readme_chars: int = 6000,
+        on_result: Optional[Callable[[BulkResult], None]] = None,
+        **tweet_options,
+    ) -> int:
+        """
+        Generate a draft for every URL not already completed in the checkpoint.
+
+        URLs are consumed lazily and at most `concurrency * 2` repos are in
+        flight at once, so memory stays bounded for arbitrarily long inputs.
+        Every finished repo is appended to the checkpoint immediately.
+
+        Returns:
+            Number of repos processed in this run (skipped ones excluded).
+        """
+        done = self.load_completed(checkpoint_path)
+        concurrency = max(1, concurrency)
+        max_pending = concurrency * 2
+        processed = 0
+
+        try:
+            torn = self._has_torn_tail(checkpoint_path)
+            checkpoint = open(checkpoint_path, "a", encoding="utf-8")
+            if torn:
+                # Terminate a partial last line so the next entry stays parseable.
+                checkpoint.write("\n")
+        except OSError as exc:
+            raise BulkServiceError(f"Failed to open checkpoint: {exc}") from exc
+
+        with checkpoint:
+            pool = ThreadPoolExecutor(max_workers=concurrency)
+            pending = set()
+
+            def record(future):
+                nonlocal processed
+                result = future.result()
+                checkpoint.write(json.dumps(asdict(result), ensure_ascii=False) + "\n")
+                checkpoint.flush()
+                processed += 1
+                if on_result:
+                    on_result(result)
+
+            def drain(return_when):
+                nonlocal pending
+                finished, pending = wait(pending, return_when=return_when)
+                for future in finished:
+                    record(future)
+
+            try:
+                for url in urls:
+                    if url in done:
+                        continue
+                    done.add(url)
+                    pending.add(pool.submit(self._process, url, readme_chars, tweet_options))
+                    if len(pending) >= max_pending:
+                        drain(FIRST_COMPLETED)
+                if pending:
+                    drain(ALL_COMPLETED)
+            except BaseException:
+                # Interrupted: do not start (and pay for) queued repos, but keep
+                # the ones that already finished.
+                # (Future.cancel rather than shutdown(cancel_futures=True),
+                # which needs Python 3.9.)
+                for future in pending:
+                    future.cancel()
+                pool.shutdown(wait=False)
+                for future in pending:
+                    if future.done() and not future.cancelled():
+                        record(future)
+                raise
+            pool.shutdown()
+
+        return processed
+
+    def _process(self, url: str, readme_chars: int, tweet_options: dict) -> BulkResult:
+        name = url
+        try:
+            repo = self.fetch_service.fetch_repo(url)
+            name = repo.name
+            try:
+                readme_text = self.readme_service.fetch_readme(repo.url, max_chars=readme_chars)
+            except ReadmeServiceError:
+                readme_text = ""
+
+            req = TweetRequest(
+                repo_name=repo.name,
+                repo_url=repo.url,
+                description=repo.description,
+                language=repo.language,
+                stars=repo.stars,
+                stars_today=repo.stars_today,
+                readme_text=readme_text,
+                **tweet_options,
+            )
+            system, prompt = self.prompt_service.build_tweet_messages(req)
+            validator = TweetValidator(max_chars=req.max_chars)
+            check = validator.generate(self.ai_client, system, prompt, thread=req.thread)
+        except (FetchServiceError, AIServiceError) as exc:
+            return BulkResult(url=url, name=name, status="failed", error=str(exc))
+        except Exception as exc:
+            # One bad repo (timeout, unexpected API payload, bug) must not
+            # abort a run over hundreds of them.
+            return BulkResult(url=url, name=name, status="failed", error=f"{type(exc).__name__}: {exc}")
+        return BulkResult(
+            url=url,
+            name=repo.name,
+            status="ok",
+            draft=check.as_text(req.thread),
+            error=" ".join(check.errors),
+        )
+
+    @staticmethod
+    def _has_torn_tail(path: str) -> bool:
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return False
+        with open(path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+
+    @staticmethod
+    def read_urls(path: str) -> Iterator[str]:
+        """Yield repo URLs from a text file, one per line; `owner/repo` is accepted."""
+        try:
+            f = open(path, "r", encoding="utf-8")
+        except OSError as exc:
+            raise BulkServiceError(f"Failed to read input: {exc}") from exc
+        with f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                if "://" not in line:
+                    line = f"https://github.com/{line.strip('/')}"
+                yield line.rstrip("/")
+
+    @staticmethod
+    def load_completed(checkpoint_path: str) -> Set[str]:
+        """Return URLs that already have a successful draft in the checkpoint."""
+        done: Set[str] = set()
+        if not os.path.exists(checkpoint_path):
+            return done
+        for entry in BulkService.iter_checkpoint(checkpoint_path):
+            if entry.status == "ok":
+                done.add(entry.url)
+        return done
+
+    @staticmethod
+    def iter_checkpoint(checkpoint_path: str) -> Iterator[BulkResult]:
+        """Stream entries from a checkpoint file, skipping torn or invalid lines."""
+        with open(checkpoint_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    data = json.loads(line)
+                    yield BulkResult(**data)
+                except (ValueError, TypeError):
+                    # A crash mid-write can leave a partial last line.
+                    continue
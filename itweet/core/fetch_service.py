@@ -1,21 +1,57 @@
 """Fetch services for external sources."""
 from __future__ import annotations
 
+import os
+import time
 from dataclasses import dataclass
 from typing import List, Optional
-from urllib.parse import quote
+from urllib.parse import quote, urlparse
 
 import requests
 from bs4 import BeautifulSoup
 
 
 BASE_URL = "https://github.com/trending"
+API_BASE_URL = "https://api.github.com"
 
 
 class FetchServiceError(RuntimeError):
     pass
 
 
+def github_token() -> Optional[str]:
+    """GitHub token from GITHUB_TOKEN or GH_TOKEN, if set."""
+    return (os.getenv("GITHUB_TOKEN") or os.getenv("GH_TOKEN") or "").strip() or None
+
+
+def github_api_headers(token: Optional[str]) -> dict:
+    headers = {
+        "Accept": "application/vnd.github+json",
+        "User-Agent": "Mozilla/5.0",
+    }
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    return headers
+
+
+def rate_limit_message(response, token: Optional[str]) -> Optional[str]:
+    """Readable error for a GitHub API rate-limit response, or None if it is not one."""
+    if response.status_code not in (403, 429):
+        return None
+    headers = response.headers
+    if response.status_code == 403 and headers.get("X-RateLimit-Remaining") != "0" and "Retry-After" not in headers:
+        return None
+    message = f"GitHub API rate limit exceeded (HTTP {response.status_code})"
+    if headers.get("Retry-After", "").isdigit():
+        message += f"; retry in {headers['Retry-After']}s"
+    elif headers.get("X-RateLimit-Reset", "").isdigit():
+        reset = time.strftime("%H:%M", time.localtime(int(headers["X-RateLimit-Reset"])))
+        message += f"; resets at {reset}"
+    if not token:
+        message += ". Set GITHUB_TOKEN or GH_TOKEN to raise the limit from 60 to 5000 requests/hour."
+    return message
+
+
 @dataclass
 class TrendingRepo:
     name: str
@@ -27,8 +63,21 @@ class TrendingRepo:
 
 
 class FetchService:
-    def __init__(self, timeout_seconds: int = 20) -> None:
+    def __init__(
+        self,
+        timeout_seconds: int = 20,
+        base_url: str = BASE_URL,
+        api_base_url: str = API_BASE_URL,
+        session: Optional[requests.Session] = None,
+        token: Optional[str] = None,
+    ) -> None:
         self.timeout_seconds = timeout_seconds
+        self.base_url = base_url
+        self.api_base_url = api_base_url
+        # Anonymous API calls are limited to 60/hour; a token raises that to 5000.
+        self.token = token or github_token()
+        # A shared Session reuses pooled connections; plain `requests` opens new ones.
+        self.http = session or requests
 
     def fetch_github_trending(
         self,
@@ -39,7 +88,7 @@ class FetchService:
         headers = {"User-Agent": "Mozilla/5.0"}
 
         try:
-            response = requests.get(url, headers=headers, timeout=self.timeout_seconds)
+            response = self.http.get(url, headers=headers, timeout=self.timeout_seconds)
         except requests.RequestException as exc:
             raise FetchServiceError(f"Network error while fetching GitHub Trending: {exc}") from exc
         if response.status_code != 200:
@@ -85,12 +134,47 @@ class FetchService:
 
         return trending_repos
 
-    @staticmethod
-    def _build_github_url(since: str, language: Optional[str]) -> str:
+    def fetch_repo(self, repo_url: str) -> TrendingRepo:
+        """Fetch metadata for a single repo via the GitHub REST API."""
+        parsed = urlparse(repo_url)
+        parts = [p for p in parsed.path.split("/") if p]
+        if parsed.netloc.lower() != "github.com" or len(parts) < 2:
+            raise FetchServiceError(f"Invalid repo URL: {repo_url}")
+        owner, repo = parts[0], parts[1]
+        if repo.endswith(".git"):
+            repo = repo[:-4]
+
+        url = f"{self.api_base_url}/repos/{owner}/{repo}"
+        headers = github_api_headers(self.token)
+        try:
+            response = self.http.get(url, headers=headers, timeout=self.timeout_seconds)
+        except requests.RequestException as exc:
+            raise FetchServiceError(f"Network error while fetching {owner}/{repo}: {exc}") from exc
+        limited = rate_limit_message(response, self.token)
+        if limited:
+            raise FetchServiceError(limited)
+        if response.status_code != 200:
+            raise FetchServiceError(f"Failed to fetch {owner}/{repo}: {response.status_code}")
+
+        try:
+            data = response.json()
+        except ValueError as exc:
+            raise FetchServiceError(f"Invalid API response for {owner}/{repo}") from exc
+
+        return TrendingRepo(
+            name=data.get("full_name") or f"{owner}/{repo}",
+            url=data.get("html_url") or f"https://github.com/{owner}/{repo}",
+            description=data.get("description") or "",
+            language=data.get("language") or "N/A",
+            stars=int(data.get("stargazers_count") or 0),
+            stars_today=0,
+        )
+
+    def _build_github_url(self, since: str, language: Optional[str]) -> str:
         since = since.lower()
         if language:
-            return f"{BASE_URL}/{quote(language)}?since={since}"
-        return f"{BASE_URL}?since={since}"
+            return f"{self.base_url}/{quote(language)}?since={since}"
+        return f"{self.base_url}?since={since}"
 
     @staticmethod
     def _clean_repo_name(text: str) -> str:
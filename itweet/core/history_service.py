@@ -0,0 +1,290 @@
+"""Append-only columnar history of GitHub Trending snapshots."""
+from __future__ import annotations
+
+import os
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from .fetch_service import TrendingRepo
+
+
+DEFAULT_HISTORY_DIR = os.path.expanduser("~/.itweet/history")
+
+PERIOD_CODES = {"daily": 0, "weekly": 1, "monthly": 2}
+
+# column name -> (array typecode, numpy dtype). Each column is a flat file of
+# fixed-size little-endian values, so rows can be appended without rewriting
+# anything and read back with a memory map.
+COLUMNS = {
+    "day": ("i", "<i4"),
+    "repo_id": ("i", "<i4"),
+    "period": ("b", "<i1"),
+    "stars": ("q", "<i8"),
+    "stars_today": ("i", "<i4"),
+}
+
+
+class HistoryServiceError(RuntimeError):
+    pass
+
+
+@dataclass
+class RepoMomentum:
+    name: str
+    first_seen: int
+    days_on_trending: int
+    stars: int
+    velocity: float
+    acceleration: float
+
+
+class HistoryService:
+    def __init__(self, history_dir: Optional[str] = None) -> None:
+        self.history_dir = history_dir or DEFAULT_HISTORY_DIR
+        self._names_path = os.path.join(self.history_dir, "repos.txt")
+        self._names: Optional[List[str]] = None
+        self._ids: Dict[str, int] = {}
+        self._persisted = 0
+
+    def record_snapshot(
+        self,
+        repos: Iterable[TrendingRepo],
+        since: str = "daily",
+        day: Optional[int] = None,
+    ) -> int:
+        """
+        Append one row per repo to the snapshot columns.
+
+        Args:
+            repos: Repos scraped from GitHub Trending.
+            since: Trending period the repos were scraped for.
+            day: Day number (days since Unix epoch, UTC). Defaults to today.
+
+        Returns:
+            Number of rows written.
+        """
+        period = PERIOD_CODES.get((since or "daily").lower(), 0)
+        day = self.today() if day is None else int(day)
+
+        rows = {name: array(typecode) for name, (typecode, _) in COLUMNS.items()}
+        for repo in repos:
+            rows["day"].append(day)
+            rows["repo_id"].append(self._intern(repo.name))
+            rows["period"].append(period)
+            rows["stars"].append(int(repo.stars))
+            rows["stars_today"].append(int(repo.stars_today))
+
+        count = len(rows["day"])
+        if not count:
+            return 0
+
+        try:
+            os.makedirs(self.history_dir, exist_ok=True)
+            self._drop_torn_rows()
+            self._flush_names()
+            for name, values in rows.items():
+                if values.itemsize > 1 and not _LITTLE_ENDIAN:
+                    values.byteswap()
+                with open(self._column_path(name), "ab") as f:
+                    values.tofile(f)
+        except OSError as exc:
+            raise HistoryServiceError(f"Failed to write trending history: {exc}") from exc
+        return count
+
+    def momentum(
+        self,
+        window_days: int = 7,
+        end_day: Optional[int] = None,
+        since: str = "daily",
+    ) -> List[RepoMomentum]:
+        """
+        Compute per-repo momentum over the last `window_days` days.
+
+        velocity is the least-squares slope of total stars per day and
+        acceleration is the slope of stars_today per day. Repos seen on
+        fewer than two distinct days in the window get 0.0 for both.
+        """
+        np = _require_numpy()
+        cols = self._load_columns()
+        names = self._load_names()
+        if cols is None or not names:
+            return []
+
+        window_days = max(1, window_days)
+        end_day = self.today() if end_day is None else int(end_day)
+        start_day = end_day - window_days + 1
+        period = PERIOD_CODES.get((since or "daily").lower(), 0)
+        n_repos = len(names)
+
+        day = cols["day"]
+        repo_id = cols["repo_id"]
+
+        # first_seen uses the whole history, not just the window.
+        known = repo_id < n_repos
+        first_seen = np.full(n_repos, np.iinfo(np.int32).max, dtype=np.int64)
+        np.minimum.at(first_seen, repo_id[known], day[known])
+
+        mask = known & (cols["period"] == period) & (day >= start_day) & (day <= end_day)
+        if not mask.any():
+            return []
+        ids = repo_id[mask].astype(np.int64)
+        x = (day[mask] - start_day).astype(np.float64)
+        stars = cols["stars"][mask].astype(np.float64)
+        stars_today = cols["stars_today"][mask].astype(np.float64)
+
+        unique_days = np.unique(ids * (window_days + 1) + x.astype(np.int64))
+        days_on_trending = np.bincount(unique_days // (window_days + 1), minlength=n_repos)
+
+        n = np.bincount(ids, minlength=n_repos).astype(np.float64)
+        sx = np.bincount(ids, weights=x, minlength=n_repos)
+        sxx = np.bincount(ids, weights=x * x, minlength=n_repos)
+        denom = n * sxx - sx * sx
+        valid = days_on_trending >= 2
+        safe = np.where(valid, denom, 1.0)
+
+        def slope(y):
+            sy = np.bincount(ids, weights=y, minlength=n_repos)
+            sxy = np.bincount(ids, weights=x * y, minlength=n_repos)
+            return np.where(valid, (n * sxy - sx * sy) / safe, 0.0)
+
+        velocity = slope(stars)
+        acceleration = slope(stars_today)
+
+        latest_stars = np.zeros(n_repos, dtype=np.int64)
+        order = np.argsort(x, kind="stable")
+        latest_stars[ids[order]] = cols["stars"][mask][order]
+
+        present = np.flatnonzero(n > 0)
+        return [
+            RepoMomentum(
+                name=names[i],
+                first_seen=int(first_seen[i]),
+                days_on_trending=int(days_on_trending[i]),
+                stars=int(latest_stars[i]),
+                velocity=float(velocity[i]),
+                acceleration=float(acceleration[i]),
+            )
+            for i in present
+        ]
+
+    def rank_repos(
+        self,
+        repos: List[TrendingRepo],
+        by: str = "velocity",
+        window_days: int = 7,
+        since: str = "daily",
+    ) -> List[TrendingRepo]:
+        """
+        Reorder repos by a momentum signal (velocity or acceleration).
+
+        Repos without history keep their trending order after the ranked ones.
+        """
+        if by not in ("velocity", "acceleration"):
+            raise HistoryServiceError(f"Unknown ranking signal: {by}")
+        stats = {m.name: m for m in self.momentum(window_days=window_days, since=since)}
+
+        def key(item):
+            idx, repo = item
+            m = stats.get(repo.name)
+            if m is None or m.days_on_trending < 2:
+                return (1, 0.0, idx)
+            return (0, -getattr(m, by), idx)
+
+        return [repo for _, repo in sorted(enumerate(repos), key=key)]
+
+    @staticmethod
+    def today() -> int:
+        return int(time.time() // 86400)
+
+    def _intern(self, name: str) -> int:
+        names = self._load_names()
+        repo_id = self._ids.get(name)
+        if repo_id is None:
+            repo_id = len(names)
+            names.append(name)
+            self._ids[name] = repo_id
+        return repo_id
+
+    def _load_names(self) -> List[str]:
+        if self._names is None:
+            self._names = []
+            if os.path.exists(self._names_path):
+                with open(self._names_path, "r", encoding="utf-8") as f:
+                    lines = f.read().split("\n")
+                # Every complete name ends with a newline; whatever follows the
+                # last one is a torn write (see _drop_torn_rows).
+                self._names = lines[:-1]
+            self._ids = {name: idx for idx, name in enumerate(self._names)}
+            self._persisted = len(self._names)
+        return self._names
+
+    def _flush_names(self) -> None:
+        names = self._load_names()
+        new = names[self._persisted :]
+        if not new:
+            return
+        with open(self._names_path, "a", encoding="utf-8") as f:
+            for name in new:
+                f.write(name + "\n")
+        self._persisted = len(names)
+
+    def _drop_torn_rows(self) -> None:
+        """
+        Cut every column back to the rows present in all of them, and
+        repos.txt back to its last complete line, so a crash mid-append
+        cannot shift columns or repo ids against each other for good.
+        """
+        if os.path.exists(self._names_path):
+            with open(self._names_path, "rb+") as f:
+                data = f.read()
+                if data and not data.endswith(b"\n"):
+                    f.truncate(data.rfind(b"\n") + 1)
+
+        sizes = {}
+        for name, (typecode, _) in COLUMNS.items():
+            path = self._column_path(name)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            sizes[name] = size // array(typecode).itemsize
+        rows = min(sizes.values())
+        for name, (typecode, _) in COLUMNS.items():
+            path = self._column_path(name)
+            if os.path.exists(path) and os.path.getsize(path) != rows * array(typecode).itemsize:
+                os.truncate(path, rows * array(typecode).itemsize)
+
+    def _load_columns(self):
+        np = _require_numpy()
+        sizes = {}
+        for name, (_, dtype) in COLUMNS.items():
+            path = self._column_path(name)
+            if not os.path.exists(path):
+                return None
+            sizes[name] = os.path.getsize(path) // np.dtype(dtype).itemsize
+
+        # An interrupted append can leave columns with different lengths;
+        # only rows present in every column are read. The next append
+        # truncates the torn tail (see _drop_torn_rows).
+        rows = min(sizes.values())
+        if rows == 0:
+            return None
+        return {
+            name: np.memmap(self._column_path(name), dtype=dtype, mode="r", shape=(rows,))
+            for name, (_, dtype) in COLUMNS.items()
+        }
+
+    def _column_path(self, name: str) -> str:
+        return os.path.join(self.history_dir, f"{name}.col")
+
+
+_LITTLE_ENDIAN = array("H", [1]).tobytes()[0] == 1
+
+
+def _require_numpy():
+    try:
+        import numpy
+    except ImportError as exc:
+        raise HistoryServiceError(
+            "Trending analytics require numpy. Install it with: pip install 'itweet[history]'"
+        ) from exc
+    return numpy
@@ -0,0 +1,157 @@
+"""Tolerant JSON parsing for model output (code fences, prose, truncation)."""
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, List, Tuple
+
+
+_FENCE_RE = re.compile(r"^\s*```[a-zA-Z]*\s*|\s*```\s*$")
+_OPENER_RE = re.compile(r"[\[{]")
+_CLOSERS = {"[": "]", "{": "}"}
+_MAX_REPAIR_STARTS = 8
+
+
+def loads_tolerant(text: str) -> Any:
+    """
+    Parse JSON from model output, best-effort.
+
+    Tries the text as-is, then the longest JSON value embedded in prose. A
+    value that does not decode gets a single-pass repair that escapes raw
+    newlines in strings, drops trailing commas and, if the output was cut
+    off, keeps every complete element and closes the open brackets.
+
+    Raises:
+        ValueError: if nothing usable could be recovered.
+
+    Regression checks (python -m doctest itweet/core/json_parser.py):
+
+    >>> loads_tolerant('{"picks":[{"id":1,"reason":"a"},{"id":2,"reason":"tr')
+    {'picks': [{'id': 1, 'reason': 'a'}, {'id': 2}]}
+    >>> loads_tolerant('[{"id":1},{"id":2,"rea')
+    [{'id': 1}, {'id': 2}]
+    >>> loads_tolerant('I looked at repos [1-3] and chose: {"picks":[]}')
+    {'picks': []}
+    >>> loads_tolerant('Of [1] I chose {"picks":[{"id":2}]}')
+    {'picks': [{'id': 2}]}
+    """
+    text = _FENCE_RE.sub("", (text or "").strip())
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+
+    starts = [m.start() for m in _OPENER_RE.finditer(text)]
+    if not starts:
+        raise ValueError("No JSON value found.")
+
+    # Prose can contain brackets too ("repos [1-3]", "[1]"), so look at every
+    # top-level opener: those that decode, and those that need repair (a
+    # truncated reply). Openers nested in a failed one are part of it, not
+    # candidates of their own. The value covering the most text wins.
+    decoder = json.JSONDecoder()
+    best = None
+    best_span = 0
+    last_error = None
+    repairs = 0
+    end = -1
+    for start in starts:
+        if start < end:
+            continue
+        try:
+            value, end = decoder.raw_decode(text, start)
+        except json.JSONDecodeError as exc:
+            last_error = last_error or exc
+            end = _extent(text, start)
+            if end - start <= best_span or repairs >= _MAX_REPAIR_STARTS:
+                continue
+            repairs += 1
+            try:
+                value = json.loads(_repair(text[start:end]))
+            except json.JSONDecodeError as repair_exc:
+                last_error = repair_exc
+                continue
+        if end - start > best_span:
+            best, best_span = value, end - start
+    if best_span:
+        return best
+    raise ValueError(f"Could not repair JSON: {last_error}")
+
+
+def _extent(text: str, start: int) -> int:
+    """End of the bracketed span opened at `start`, or len(text) if it never closes."""
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in _CLOSERS:
+            depth += 1
+        elif ch in "]}":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    return len(text)
+
+
+def _repair(text: str) -> str:
+    out: List[str] = []
+    stack: List[str] = []
+    # (length of out, open brackets) at points where cutting yields valid JSON
+    # once the open brackets are closed.
+    safe: Tuple[int, List[str]] = (0, [])
+    in_string = False
+    escaped = False
+
+    for ch in text:
+        if in_string:
+            if escaped:
+                escaped = False
+                out.append(ch)
+            elif ch == "\\":
+                escaped = True
+                out.append(ch)
+            elif ch == '"':
+                in_string = False
+                out.append(ch)
+            elif ch == "\n":
+                out.append("\\n")
+            else:
+                out.append(ch)
+            continue
+
+        if ch == '"':
+            in_string = True
+            out.append(ch)
+        elif ch in _CLOSERS:
+            stack.append(ch)
+            out.append(ch)
+            safe = (len(out), list(stack))
+        elif ch in "]}":
+            while out and out[-1] in " \t\r\n,":
+                out.pop()
+            if not stack:
+                break
+            out.append(_CLOSERS[stack.pop()])
+            if not stack:
+                return "".join(out)
+            safe = (len(out), list(stack))
+        elif ch == ",":
+            safe = (len(out), list(stack))
+            out.append(ch)
+        else:
+            out.append(ch)
+
+    # Truncated: fall back to the last safe cut and close what is open.
+    length, open_brackets = safe
+    repaired = "".join(out[:length]).rstrip().rstrip(",")
+    return repaired + "".join(_CLOSERS[b] for b in reversed(open_brackets))
@@ -0,0 +1,413 @@
+"""Embeddable asyncio pipeline of pluggable stages: fetch -> select -> README -> generate."""
+from __future__ import annotations
+
+import asyncio
+import functools
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from .ai_service import AIServiceError
+from .fetch_service import FetchService, FetchServiceError, TrendingRepo
+from .history_service import HistoryService, HistoryServiceError
+from .prompt_service import PromptService, TweetRequest
+from .readme_service import ReadmeService, ReadmeServiceError
+from .selector_service import SelectedRepo, SelectorService, SelectorServiceError
+from .similarity_service import SimilarityService, SimilarityServiceError, readme_head
+from .tweet_validator import TweetValidator, ValidationResult
+
+
+class PipelineError(RuntimeError):
+    pass
+
+
+@dataclass
+class PipelineConfig:
+    since: str = "daily"
+    language: Optional[str] = None
+    limit: int = 25
+    pick: int = 4
+    select_chunk_size: int = 40
+    readme_chars: int = 6000
+    rank_by: str = "trending"
+    window: int = 7
+    record_history: bool = True
+    allow_repeats: bool = False
+    list_only: bool = False
+    no_tweets: bool = False
+    thread: bool = False
+    tone: str = "informative"
+    max_chars: int = 280
+    tweet_language: str = "English"
+    concurrency: int = 4
+    queue_size: int = 8
+
+
+@dataclass
+class PipelineEvent:
+    """
+    kind is one of: notice, warning, trending, skipped, selected, readme,
+    readme_failed, draft, draft_failed, draft_skipped, done.
+    """
+
+    kind: str
+    repo: Optional[str] = None
+    data: Any = None
+    message: str = ""
+
+
+@dataclass
+class PipelineResult:
+    repos: List[TrendingRepo] = field(default_factory=list)
+    selected: List[SelectedRepo] = field(default_factory=list)
+    readmes: Dict[str, str] = field(default_factory=dict)
+    drafts: List[str] = field(default_factory=list)
+    local_repairs: int = 0
+    regenerations: int = 0
+
+
+_DONE = object()
+
+
+class Pipeline:
+    def __init__(
+        self,
+        ai_client=None,
+        fetch_service: Optional[FetchService] = None,
+        readme_service: Optional[ReadmeService] = None,
+        prompt_service: Optional[PromptService] = None,
+        history_service: Optional[HistoryService] = None,
+        similarity_service: Optional[SimilarityService] = None,
+        executor=None,
+        stages: Optional[List[Any]] = None,
+    ) -> None:
+        """
+        ai_client must expose:
+            generate_text(prompt: str, system: Optional[str] = None, json_schema: Optional[dict] = None) -> str
+        It may be None when only listing trending repos.
+
+        Blocking service calls run on `executor` (default: the loop's
+        default thread pool). `stages` replaces default_stages(); see
+        BatchStage and ItemStage.
+        """
+        self.ai_client = ai_client
+        self.fetch_service = fetch_service or FetchService()
+        self.readme_service = readme_service or ReadmeService()
+        self.prompt_service = prompt_service or PromptService()
+        self.history_service = history_service or HistoryService()
+        self.similarity_service = similarity_service
+        self.executor = executor
+        self.stages = stages if stages is not None else default_stages()
+
+    async def run(
+        self,
+        config: PipelineConfig,
+        on_event: Optional[Callable[[PipelineEvent], None]] = None,
+    ) -> PipelineResult:
+        """Run the pipeline to completion and return the collected result."""
+        result = PipelineResult()
+        async for event in self.events(config):
+            if on_event:
+                on_event(event)
+            if event.kind == "done":
+                result = event.data
+        return result
+
+    async def events(self, config: PipelineConfig) -> AsyncIterator[PipelineEvent]:
+        """
+        Yield events as stages make progress. The last event is `done` with
+        a PipelineResult; fatal errors are raised as PipelineError.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        task = asyncio.ensure_future(self._execute(config, queue.put_nowait))
+        task.add_done_callback(lambda _: queue.put_nowait(_DONE))
+        try:
+            while True:
+                event = await queue.get()
+                if event is _DONE:
+                    break
+                yield event
+            task.result()
+        finally:
+            if not task.done():
+                task.cancel()
+
+    async def _call(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(fn, *args, **kwargs))
+
+    async def _execute(self, config: PipelineConfig, emit: Callable[[PipelineEvent], None]) -> None:
+        ctx = StageContext(pipeline=self, config=config, result=PipelineResult(), emit=emit)
+        items: List[Any] = []
+        stages = list(self.stages)
+        while stages:
+            if isinstance(stages[0], ItemStage):
+                chain = []
+                while stages and isinstance(stages[0], ItemStage):
+                    chain.append(stages.pop(0))
+                items = await self._run_item_stages(ctx, chain, items)
+            else:
+                items = await stages.pop(0).run(ctx, items)
+            # The first stage starts from an empty batch; after that, an empty
+            # batch means there is nothing left to do.
+            if not items:
+                break
+
+        result = ctx.result
+        drafts = ctx.state.get("drafts", {})
+        result.drafts = [drafts[s.name] for s in result.selected if s.name in drafts]
+        similarity = ctx.state.get("similarity")
+        if similarity:
+            try:
+                similarity.save()
+            except SimilarityServiceError as exc:
+                emit(PipelineEvent(kind="warning", message=str(exc)))
+        emit(PipelineEvent(kind="done", data=result))
+
+    async def _run_item_stages(self, ctx: "StageContext", chain: List["ItemStage"], items: List[Any]) -> List[Any]:
+        """
+        Run consecutive item stages joined by bounded queues, so e.g. drafts
+        for early repos are generated while later READMEs are still
+        downloading.
+        """
+        workers = max(1, ctx.config.concurrency)
+        inbox: asyncio.Queue = asyncio.Queue()
+        for item in items:
+            inbox.put_nowait(item)
+        for _ in range(workers):
+            inbox.put_nowait(_DONE)
+        queues = [inbox] + [asyncio.Queue(maxsize=max(1, ctx.config.queue_size)) for _ in chain[1:]]
+        done: List[Any] = []
+
+        async def worker(stage, source, sink):
+            while True:
+                item = await source.get()
+                if item is _DONE:
+                    return
+                item = await stage.process(ctx, item)
+                if item is None:
+                    continue
+                if sink is None:
+                    done.append(item)
+                else:
+                    await sink.put(item)
+
+        async def run_stage(idx, stage):
+            source = queues[idx]
+            sink = queues[idx + 1] if idx + 1 < len(queues) else None
+            await asyncio.gather(*(worker(stage, source, sink) for _ in range(workers)))
+            if sink is not None:
+                for _ in range(workers):
+                    await sink.put(_DONE)
+
+        tasks = [asyncio.ensure_future(run_stage(idx, stage)) for idx, stage in enumerate(chain)]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            # If a stage fails, upstream workers may be blocked on a full queue.
+            for task in tasks:
+                task.cancel()
+        return done
+
+
+@dataclass
+class StageContext:
+    """State shared by the stages of one run. `state` carries stage outputs (by_name, similarity, drafts)."""
+
+    pipeline: Pipeline
+    config: PipelineConfig
+    result: PipelineResult
+    emit: Callable[[PipelineEvent], None]
+    state: Dict[str, Any] = field(default_factory=dict)
+
+    async def call(self, fn, *args, **kwargs):
+        """Run a blocking call on the pipeline's executor."""
+        return await self.pipeline._call(fn, *args, **kwargs)
+
+
+class BatchStage(ABC):
+    """
+    A stage that sees the whole batch at once. run() returns the items for
+    the next stage; an empty list or None ends the run.
+    """
+
+    @abstractmethod
+    async def run(self, ctx: StageContext, items: List[Any]) -> Optional[List[Any]]:
+        ...
+
+
+class ItemStage(ABC):
+    """
+    A stage that handles one item at a time. Consecutive item stages are
+    joined by bounded queues with `config.concurrency` workers each.
+    process() returns the item for the next stage, or None to drop it.
+    """
+
+    @abstractmethod
+    async def process(self, ctx: StageContext, item: Any) -> Any:
+        ...
+
+
+class FetchStage(BatchStage):
+    """Fetch trending repos, record history and apply momentum ranking."""
+
+    async def run(self, ctx, items):
+        config, pipeline = ctx.config, ctx.pipeline
+        try:
+            repos = await ctx.call(
+                pipeline.fetch_service.fetch_github_trending,
+                since=config.since,
+                language=config.language,
+            )
+        except FetchServiceError as exc:
+            raise PipelineError(str(exc)) from exc
+
+        if not repos:
+            ctx.emit(PipelineEvent(kind="notice", message="No trending repositories found."))
+            return None
+
+        if config.record_history:
+            try:
+                await ctx.call(pipeline.history_service.record_snapshot, repos, since=config.since)
+            except HistoryServiceError as exc:
+                ctx.emit(PipelineEvent(kind="warning", message=f"Failed to record trending history: {exc}"))
+
+        rank_by = config.rank_by.lower()
+        if rank_by != "trending":
+            try:
+                repos = await ctx.call(
+                    pipeline.history_service.rank_repos,
+                    repos,
+                    by=rank_by,
+                    window_days=config.window,
+                    since=config.since,
+                )
+            except HistoryServiceError as exc:
+                raise PipelineError(str(exc)) from exc
+
+        repos = repos[: max(1, config.limit)]
+        ctx.result.repos = repos
+        ctx.state["by_name"] = {r.name: r for r in repos}
+        ctx.emit(PipelineEvent(kind="trending", data=repos))
+        return None if config.list_only else repos
+
+
+class DedupeStage(BatchStage):
+    """Drop repos already covered by earlier drafts (unless allow_repeats)."""
+
+    async def run(self, ctx, items):
+        if ctx.config.allow_repeats:
+            return items
+        pipeline = ctx.pipeline
+        if pipeline.similarity_service is None:
+            pipeline.similarity_service = SimilarityService()
+        similarity = ctx.state["similarity"] = pipeline.similarity_service
+        candidates, seen = similarity.filter_repos(items)
+        if seen:
+            ctx.emit(PipelineEvent(kind="skipped", data=seen))
+        if not candidates:
+            ctx.emit(
+                PipelineEvent(
+                    kind="notice",
+                    message="No new repositories to pick from. Use --allow-repeats to include them.",
+                )
+            )
+        return candidates
+
+
+class SelectStage(BatchStage):
+    """Let the AI pick the repos worth drafting."""
+
+    async def run(self, ctx, items):
+        config = ctx.config
+        pick = max(1, min(config.pick, len(items)))
+        selector = SelectorService(ctx.pipeline.ai_client, chunk_size=config.select_chunk_size)
+        try:
+            selected = await ctx.call(selector.select_top_repos, items, limit=pick)
+        except (SelectorServiceError, AIServiceError) as exc:
+            raise PipelineError(f"failed to select repos via AI: {exc}") from exc
+        if not selected:
+            raise PipelineError("AI did not select any repositories.")
+        ctx.result.selected = selected
+        ctx.emit(PipelineEvent(kind="selected", data=selected))
+        return selected
+
+
+class ReadmeStage(ItemStage):
+    """Download each selected repo's README (best-effort)."""
+
+    async def process(self, ctx, item):
+        try:
+            text = await ctx.call(ctx.pipeline.readme_service.fetch_readme, item.url, max_chars=ctx.config.readme_chars)
+            ctx.emit(PipelineEvent(kind="readme", repo=item.name, data=len(text)))
+        except ReadmeServiceError as exc:
+            text = ""
+            ctx.emit(PipelineEvent(kind="readme_failed", repo=item.name, message=str(exc)))
+        ctx.result.readmes[item.name] = text
+        return item
+
+
+class GenerateStage(ItemStage):
+    """Generate and validate a draft per repo (skipped with no_tweets)."""
+
+    async def process(self, ctx, item):
+        config, result, emit = ctx.config, ctx.result, ctx.emit
+        repo = ctx.state.get("by_name", {}).get(item.name)
+        if config.no_tweets or not repo:
+            return item
+        similarity = ctx.state.get("similarity")
+        readme_text = result.readmes.get(repo.name, "")
+        if similarity:
+            match = similarity.find("readme", readme_head(readme_text))
+            if match and match.key != repo.name:
+                emit(
+                    PipelineEvent(
+                        kind="draft_skipped",
+                        repo=repo.name,
+                        message=f"README matches {match.key}, already covered.",
+                    )
+                )
+                return None
+
+        req = TweetRequest(
+            repo_name=repo.name,
+            repo_url=repo.url,
+            description=repo.description,
+            language=repo.language,
+            stars=repo.stars,
+            stars_today=repo.stars_today,
+            readme_text=readme_text,
+            output_language=config.tweet_language,
+            tone=config.tone,
+            max_chars=config.max_chars,
+            thread=config.thread,
+        )
+        pipeline = ctx.pipeline
+        system, prompt = pipeline.prompt_service.build_tweet_messages(req)
+        validator = TweetValidator(max_chars=config.max_chars)
+        try:
+            check: ValidationResult = await ctx.call(
+                validator.generate, pipeline.ai_client, system, prompt, thread=config.thread
+            )
+        except AIServiceError as exc:
+            emit(PipelineEvent(kind="draft_failed", repo=repo.name, message=str(exc)))
+            return None
+        result.local_repairs += validator.local_repairs
+        result.regenerations += validator.regenerations
+
+        draft = check.as_text(config.thread)
+        ctx.state.setdefault("drafts", {})[repo.name] = draft
+        warnings = list(check.errors)
+        if similarity:
+            match = similarity.find("draft", draft)
+            if match:
+                warnings.append(f"This draft is very similar to an earlier one for {match.key}.")
+            similarity.add_repo(repo, readme_text)
+            similarity.add_draft(repo.name, draft)
+        emit(PipelineEvent(kind="draft", repo=repo.name, data=draft, message=" ".join(warnings)))
+        return item
+
+
+def default_stages() -> List[Any]:
+    """fetch -> dedupe -> select -> README -> generate."""
+    return [FetchStage(), DedupeStage(), SelectStage(), ReadmeStage(), GenerateStage()]
@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Tuple
 
 
 @dataclass
@@ -19,34 +20,86 @@ class TweetRequest:
     thread: bool = False
 
 
+def normalize_output_language(raw: str) -> str:
+    """Map a language code or alias (`id`, `jp`, ...) to the name used in prompts."""
+    normalized = (raw or "").strip()
+    if not normalized:
+        return "English"
+    key = normalized.lower()
+    aliases = {
+        "en": "English",
+        "english": "English",
+        "id": "Indonesian",
+        "indo": "Indonesian",
+        "indonesia": "Indonesian",
+        "indonesian": "Indonesian",
+        "bahasa indonesia": "Indonesian",
+        "ms": "Malay",
+        "malay": "Malay",
+        "melayu": "Malay",
+        "malaysia": "Malay",
+        "malasyia": "Malay",
+        "es": "Spanish",
+        "spanish": "Spanish",
+        "fr": "French",
+        "french": "French",
+        "de": "German",
+        "german": "German",
+        "ja": "Japanese",
+        "japanese": "Japanese",
+        "jp": "Japanese",
+        "ko": "Korean",
+        "korean": "Korean",
+        "zh": "Chinese",
+        "chinese": "Chinese",
+        "pt": "Portuguese",
+        "portuguese": "Portuguese",
+    }
+    return aliases.get(key, normalized)
+
+
+# Instructions shared by every tweet request. Kept byte-identical across repos
+# (no per-request values) so providers could reuse a cached prompt prefix.
+# Note: this is only ~230 tokens, below the minimum cacheable prefix of
+# current providers (about 1024 tokens for OpenAI, Anthropic and Gemini 2.5),
+# so it is not cached as-is. It only pays off if the static part grows past
+# that minimum (e.g. with a longer style guide or examples).
+TWEET_SYSTEM_PROMPT = (
+    "You are writing tweets about open-source repositories.\n"
+    "Write in casual, informal language. Sound like a Twitter influencer, but stay informative.\n"
+    "Follow the language, tone, length and output format given with each repo.\n"
+    "Be accurate. Do not invent facts not supported by README or description.\n"
+    "If unsure, keep it high-level.\n"
+    "Structure:\n"
+    "1) Opening line that is catchy and relevant.\n"
+    "   Vary the opening across outputs. Pick ONE style each time:\n"
+    "   - Problem hook: start from a clear pain/issue the repo solves.\n"
+    "   - Storytelling: a short mini-story or relatable scenario.\n"
+    "   - Benefit-first: lead with the most concrete benefit.\n"
+    "   Keep it natural, not textbook/theory. Avoid generic phrases.\n"
+    "2) GitHub link on its own line.\n"
+    "3) Bullet-style points using lines starting with '> ' (2-5 points).\n"
+    "Points can be features, usage steps, or key notes—pick what's most helpful.\n"
+    "No emojis unless they already appear in the README.\n"
+)
+
+
 class PromptService:
-    def build_tweet_prompt(self, req: TweetRequest) -> str:
+    def build_tweet_messages(self, req: TweetRequest) -> Tuple[str, str]:
         """
-        Build a prompt that generates a tweet (or short thread) based on repo metadata + README.
+        Build (system, user) prompts for a tweet (or short thread).
+
+        The system part is the static TWEET_SYSTEM_PROMPT; everything that
+        varies per request lives in the user part.
         """
-        base = (
-            f"You are writing tweets in {req.output_language} about open-source repositories.\n"
-            "Write in casual, informal language. Sound like a Twitter influencer, but stay informative.\n"
+        settings = (
+            f"Language: {req.output_language}\n"
             f"Tone: {req.tone}. Max length per tweet: {req.max_chars} chars.\n"
-            "Be accurate. Do not invent facts not supported by README or description.\n"
-            "If unsure, keep it high-level.\n"
-            "Structure:\n"
-            "1) Opening line that is catchy and relevant.\n"
-            "   Vary the opening across outputs. Pick ONE style each time:\n"
-            "   - Problem hook: start from a clear pain/issue the repo solves.\n"
-            "   - Storytelling: a short mini-story or relatable scenario.\n"
-            "   - Benefit-first: lead with the most concrete benefit.\n"
-            "   Keep it natural, not textbook/theory. Avoid generic phrases.\n"
-            "2) GitHub link on its own line.\n"
-            "3) Bullet-style points using lines starting with '> ' (2-5 points).\n"
-            "Points can be features, usage steps, or key notes—pick what's most helpful.\n"
-            "No emojis unless they already appear in the README.\n"
         )
-
         if req.thread:
-            base += "Output a short thread (2-3 tweets) as a JSON array of strings.\n"
+            settings += "Output a short thread (2-3 tweets) as a JSON array of strings.\n"
         else:
-            base += "Output a single tweet as plain text only.\n"
+            settings += "Output a single tweet as plain text only.\n"
 
         repo_block = (
             f"\nRepo:\n"
@@ -59,4 +112,11 @@ class PromptService:
 
         readme_block = f"\nREADME (truncated):\n{req.readme_text}\n"
 
-        return base + repo_block + readme_block
+        return TWEET_SYSTEM_PROMPT, settings + repo_block + readme_block
+
+    def build_tweet_prompt(self, req: TweetRequest) -> str:
+        """
+        Build a single prompt that generates a tweet (or short thread) based on repo metadata + README.
+        """
+        system, user = self.build_tweet_messages(req)
+        return system + "\n" + user
@@ -0,0 +1,373 @@
+"""Durable SQLite job queue for multi-process fetch/README/generate workers."""
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .fetch_service import FetchService, TrendingRepo
+from .prompt_service import PromptService, TweetRequest
+from .readme_service import ReadmeService, ReadmeServiceError
+from .selector_service import SelectorService
+from .tweet_validator import TweetValidator
+
+
+DEFAULT_DB_PATH = os.path.expanduser("~/.itweet/jobs.db")
+
+JOB_KINDS = ("fetch", "readme", "generate")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    lease_owner TEXT,
+    lease_expires REAL,
+    available_at REAL NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    parent_id INTEGER,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, lease_expires, id);
+"""
+
+
+class QueueServiceError(RuntimeError):
+    pass
+
+
+@dataclass
+class Job:
+    id: int
+    kind: str
+    payload: Dict[str, Any]
+    attempts: int
+    max_attempts: int
+    lease_owner: str
+
+
+class JobQueue:
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        lease_seconds: float = 120,
+        retry_delay: float = 5,
+        max_retry_delay: float = 300,
+    ) -> None:
+        """
+        Args:
+            db_path: SQLite file. WAL mode lets several worker processes on
+                the same host share it; network filesystems are not supported
+                by SQLite's locking.
+            lease_seconds: How long a claimed job stays reserved without a
+                heartbeat before another worker may take it over.
+            retry_delay: Delay before a failed job may run again; doubles
+                with each attempt, up to `max_retry_delay`.
+        """
+        self.db_path = db_path or DEFAULT_DB_PATH
+        self.lease_seconds = lease_seconds
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        directory = os.path.dirname(self.db_path)
+        try:
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            if "available_at" not in columns:
+                # Databases created before retry backoff existed.
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN available_at REAL NOT NULL DEFAULT 0")
+        except sqlite3.Error as exc:
+            raise QueueServiceError(f"Failed to open job queue {self.db_path}: {exc}") from exc
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        # BEGIN IMMEDIATE takes the write lock up front so two workers cannot
+        # claim the same row.
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    yield self._conn
+                except BaseException:
+                    self._conn.execute("ROLLBACK")
+                    raise
+                self._conn.execute("COMMIT")
+            except sqlite3.Error as exc:
+                raise QueueServiceError(f"Job queue error: {exc}") from exc
+
+    def enqueue(self, kind: str, payload: Dict[str, Any], max_attempts: int = 3) -> int:
+        with self._transaction() as conn:
+            return self._insert(conn, kind, payload, max_attempts, parent_id=None)
+
+    @staticmethod
+    def _insert(conn, kind: str, payload: Dict[str, Any], max_attempts: int, parent_id: Optional[int]) -> int:
+        if kind not in JOB_KINDS:
+            raise QueueServiceError(f"Unknown job kind: {kind}")
+        now = time.time()
+        cur = conn.execute(
+            "INSERT INTO jobs (kind, payload, max_attempts, parent_id, created, updated) VALUES (?, ?, ?, ?, ?, ?)",
+            (kind, json.dumps(payload, ensure_ascii=False), max_attempts, parent_id, now, now),
+        )
+        return int(cur.lastrowid)
+
+    def claim(self, owner: str) -> Optional[Job]:
+        """
+        Lease the oldest runnable job: queued and past its retry delay, or
+        running with an expired lease.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            # Expired leases that already used every attempt will never run again.
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = COALESCE(error, 'Lease expired.'), updated = ? "
+                "WHERE status = 'running' AND lease_expires < ? AND attempts >= max_attempts",
+                (now, now),
+            )
+            row = conn.execute(
+                "SELECT id, kind, payload, attempts, max_attempts FROM jobs "
+                "WHERE (status = 'queued' AND available_at <= ?) OR (status = 'running' AND lease_expires < ?) "
+                "ORDER BY id LIMIT 1",
+                (now, now),
+            ).fetchone()
+            if row is None:
+                return None
+            job_id, kind, payload, attempts, max_attempts = row
+            conn.execute(
+                "UPDATE jobs SET status = 'running', lease_owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated = ? WHERE id = ?",
+                (owner, now + self.lease_seconds, now, job_id),
+            )
+        return Job(
+            id=job_id,
+            kind=kind,
+            payload=json.loads(payload),
+            attempts=attempts + 1,
+            max_attempts=max_attempts,
+            lease_owner=owner,
+        )
+
+    def heartbeat(self, job: Job) -> bool:
+        """Extend the lease. Returns False if the job was taken over by another worker."""
+        now = time.time()
+        with self._transaction() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated = ? WHERE id = ? AND lease_owner = ? AND status = 'running'",
+                (now + self.lease_seconds, now, job.id, job.lease_owner),
+            )
+            return cur.rowcount == 1
+
+    def complete(
+        self,
+        job: Job,
+        result: Optional[Dict[str, Any]] = None,
+        children: Optional[List[Tuple[str, Dict[str, Any]]]] = None,
+    ) -> bool:
+        """Mark a job done and enqueue its follow-up jobs atomically."""
+        with self._transaction() as conn:
+            encoded = json.dumps(result, ensure_ascii=False) if result is not None else None
+            cur = conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, error = NULL, lease_expires = NULL, updated = ? "
+                "WHERE id = ? AND lease_owner = ? AND status = 'running'",
+                (encoded, time.time(), job.id, job.lease_owner),
+            )
+            if cur.rowcount != 1:
+                return False
+            for kind, payload in children or []:
+                self._insert(conn, kind, payload, job.max_attempts, parent_id=job.id)
+            return True
+
+    def fail(self, job: Job, error: str) -> None:
+        """
+        Record a failed attempt. The job is retried with exponential backoff
+        until max_attempts is reached.
+        """
+        status = "failed" if job.attempts >= job.max_attempts else "queued"
+        delay = min(self.max_retry_delay, self.retry_delay * 2 ** max(0, job.attempts - 1))
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, lease_owner = NULL, lease_expires = NULL, "
+                "available_at = ?, updated = ? WHERE id = ? AND lease_owner = ?",
+                (status, error, now + delay, now, job.id, job.lease_owner),
+            )
+
+    def next_retry_at(self) -> Optional[float]:
+        """Earliest time a queued job that is waiting out its retry delay becomes runnable."""
+        row = self._conn.execute(
+            "SELECT MIN(available_at) FROM jobs WHERE status = 'queued' AND available_at > ?",
+            (time.time(),),
+        ).fetchone()
+        return row[0] if row else None
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        rows = self._conn.execute("SELECT kind, status, COUNT(*) FROM jobs GROUP BY kind, status").fetchall()
+        summary: Dict[str, Dict[str, int]] = {}
+        for kind, status, count in rows:
+            summary.setdefault(kind, {})[status] = count
+        return summary
+
+    def results(self, kind: str = "generate") -> Iterator[Dict[str, Any]]:
+        cur = self._conn.execute(
+            "SELECT result FROM jobs WHERE kind = ? AND status = 'done' AND result IS NOT NULL ORDER BY id",
+            (kind,),
+        )
+        for (result,) in cur:
+            yield json.loads(result)
+
+
+class QueueWorker:
+    def __init__(
+        self,
+        queue: JobQueue,
+        ai_client=None,
+        fetch_service: Optional[FetchService] = None,
+        readme_service: Optional[ReadmeService] = None,
+        prompt_service: Optional[PromptService] = None,
+        worker_id: Optional[str] = None,
+    ) -> None:
+        """
+        ai_client must expose:
+            generate_text(prompt: str, system: Optional[str] = None, json_schema: Optional[dict] = None) -> str
+        """
+        self.queue = queue
+        self.ai_client = ai_client
+        self.fetch_service = fetch_service or FetchService()
+        self.readme_service = readme_service or ReadmeService()
+        self.prompt_service = prompt_service or PromptService()
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+    def run(self, poll_seconds: float = 2.0, exit_when_empty: bool = False, on_job=None) -> int:
+        """Process jobs until interrupted (or until the queue is empty). Returns jobs handled."""
+        handled = 0
+        while True:
+            job = self.queue.claim(self.worker_id)
+            if job is None:
+                retry_at = self.queue.next_retry_at()
+                if exit_when_empty and retry_at is None:
+                    return handled
+                wait = poll_seconds if retry_at is None else min(poll_seconds, retry_at - time.time())
+                time.sleep(max(0.05, wait))
+                continue
+            ok, error = self.process(job)
+            handled += 1
+            if on_job:
+                on_job(job, ok, error)
+
+    def process(self, job: Job) -> Tuple[bool, str]:
+        stop = threading.Event()
+        beat = threading.Thread(target=self._heartbeat_loop, args=(job, stop), daemon=True)
+        beat.start()
+        try:
+            handler = getattr(self, f"_handle_{job.kind}")
+            result, children = handler(job.payload)
+        except Exception as exc:
+            # Any handler error (including timeouts and bugs) fails just this
+            # attempt; the worker keeps going instead of holding the lease.
+            stop.set()
+            self.queue.fail(job, f"{type(exc).__name__}: {exc}")
+            return False, f"{type(exc).__name__}: {exc}"
+        finally:
+            stop.set()
+            beat.join()
+        if not self.queue.complete(job, result, children):
+            return False, "Lease lost to another worker; result discarded."
+        return True, ""
+
+    def _heartbeat_loop(self, job: Job, stop: threading.Event) -> None:
+        interval = max(1.0, self.queue.lease_seconds / 3)
+        while not stop.wait(interval):
+            try:
+                if not self.queue.heartbeat(job):
+                    return
+            except QueueServiceError:
+                continue
+
+    def _handle_fetch(self, payload: Dict[str, Any]):
+        repos = self.fetch_service.fetch_github_trending(
+            since=payload.get("since", "daily"),
+            language=payload.get("language"),
+        )
+        repos = repos[: max(1, int(payload.get("limit", 25)))]
+        if not repos:
+            return {"selected": []}, []
+
+        pick = max(1, min(int(payload.get("pick", 4)), len(repos)))
+        selected = SelectorService(self.ai_client).select_top_repos(repos, limit=pick)
+        by_name = {r.name: r for r in repos}
+        children = []
+        for item in selected:
+            repo = by_name.get(item.name)
+            if repo:
+                children.append(("readme", dict(payload.get("tweet", {}), repo=_repo_dict(repo))))
+        return {"selected": [s.name for s in selected]}, children
+
+    def _handle_readme(self, payload: Dict[str, Any]):
+        repo = payload.get("repo")
+        if repo is None:
+            repo = _repo_dict(self.fetch_service.fetch_repo(payload["url"]))
+        try:
+            readme_chars = int(payload.get("readme_chars", 6000))
+            readme_text = self.readme_service.fetch_readme(repo["url"], max_chars=readme_chars)
+        except ReadmeServiceError:
+            readme_text = ""
+        child = dict(payload, repo=repo, readme_text=readme_text)
+        child.pop("url", None)
+        return {"repo": repo["name"], "readme_chars": len(readme_text)}, [("generate", child)]
+
+    def _handle_generate(self, payload: Dict[str, Any]):
+        repo = payload["repo"]
+        max_chars = int(payload.get("max_chars", 280))
+        thread = bool(payload.get("thread", False))
+        req = TweetRequest(
+            repo_name=repo["name"],
+            repo_url=repo["url"],
+            description=repo.get("description", ""),
+            language=repo.get("language", "N/A"),
+            stars=int(repo.get("stars", 0)),
+            stars_today=int(repo.get("stars_today", 0)),
+            readme_text=payload.get("readme_text", ""),
+            output_language=payload.get("output_language", "English"),
+            tone=payload.get("tone", "informative"),
+            max_chars=max_chars,
+            thread=thread,
+        )
+        system, prompt = self.prompt_service.build_tweet_messages(req)
+        check = TweetValidator(max_chars=max_chars).generate(self.ai_client, system, prompt, thread=thread)
+        return {
+            "repo": repo["name"],
+            "url": repo["url"],
+            "draft": check.as_text(thread),
+            "valid": check.valid,
+            "errors": check.errors,
+        }, []
+
+
+def _repo_dict(repo: TrendingRepo) -> Dict[str, Any]:
+    return {
+        "name": repo.name,
+        "url": repo.url,
+        "description": repo.description,
+        "language": repo.language,
+        "stars": repo.stars,
+        "stars_today": repo.stars_today,
+    }
@@ -1,17 +1,32 @@
 """Fetch repository README content (used to reduce misinformation in tweets)."""
 from __future__ import annotations
 
+import codecs
 from dataclasses import dataclass
-from typing import Optional, Tuple
+from typing import Optional
 from urllib.parse import urlparse
 
 import requests
 
+from .fetch_service import github_api_headers, github_token, rate_limit_message
+
+
+API_BASE_URL = "https://api.github.com"
+RAW_BASE_URL = "https://raw.githubusercontent.com"
+
+# Upper bound on bytes read per README, also applied when max_chars is 0 (unlimited).
+MAX_README_BYTES = 1_000_000
+CHUNK_SIZE = 16 * 1024
+
 
 class ReadmeServiceError(RuntimeError):
     pass
 
 
+class _RateLimited(Exception):
+    pass
+
+
 @dataclass
 class RepoRef:
     owner: str
@@ -19,30 +34,41 @@ class RepoRef:
 
 
 class ReadmeService:
-    def __init__(self, timeout_seconds: int = 20) -> None:
+    def __init__(
+        self,
+        timeout_seconds: int = 20,
+        api_base_url: str = API_BASE_URL,
+        raw_base_url: str = RAW_BASE_URL,
+        session: Optional[requests.Session] = None,
+        token: Optional[str] = None,
+    ) -> None:
         self.timeout_seconds = timeout_seconds
+        self.api_base_url = api_base_url
+        self.raw_base_url = raw_base_url
+        self.token = token or github_token()
+        self.http = session or requests
 
     def fetch_readme(self, repo_url: str, max_chars: int = 12_000) -> str:
         """
         Fetch README as plain text (best-effort).
 
         Strategy:
-        1) GitHub REST API: GET /repos/{owner}/{repo}/readme -> download_url
+        1) GitHub REST API: GET /repos/{owner}/{repo}/readme as raw media type, streamed
         2) Fallback to raw URLs with common branches and filenames
         """
         ref = self._parse_repo_url(repo_url)
         if not ref:
             raise ReadmeServiceError(f"Invalid repo URL: {repo_url}")
 
-        text = self._fetch_via_github_api(ref)
+        limited = None
+        try:
+            text = self._fetch_via_github_api(ref, max_chars)
+        except _RateLimited as exc:
+            text, limited = None, str(exc)
         if text is None:
-            text = self._fetch_via_raw_fallback(ref)
+            text = self._fetch_via_raw_fallback(ref, max_chars)
         if text is None:
-            raise ReadmeServiceError("README not found.")
-
-        text = text.replace("\r\n", "\n")
-        if max_chars > 0:
-            return text[:max_chars]
+            raise ReadmeServiceError(limited or "README not found.")
         return text
 
     @staticmethod
@@ -61,49 +87,88 @@ class ReadmeService:
             repo = repo[:-4]
         return RepoRef(owner=owner, repo=repo)
 
-    def _fetch_via_github_api(self, ref: RepoRef) -> Optional[str]:
-        url = f"https://api.github.com/repos/{ref.owner}/{ref.repo}/readme"
-        headers = {
-            "Accept": "application/vnd.github+json",
-            "User-Agent": "Mozilla/5.0",
-        }
-        try:
-            r = requests.get(url, headers=headers, timeout=self.timeout_seconds)
-        except requests.RequestException:
-            return None
-
-        if r.status_code != 200:
-            return None
-
-        try:
-            data = r.json()
-        except ValueError:
-            return None
-
-        download_url = data.get("download_url")
-        if not download_url:
-            return None
+    def _fetch_via_github_api(self, ref: RepoRef, max_chars: int) -> Optional[str]:
+        # The raw media type returns the README body itself, so it can be
+        # streamed and cut off; the JSON form inlines the whole file as base64.
+        url = f"{self.api_base_url}/repos/{ref.owner}/{ref.repo}/readme"
+        headers = dict(github_api_headers(self.token), Accept="application/vnd.github.raw")
+        return self._download_text(url, max_chars, headers=headers, api=True)
 
-        try:
-            rr = requests.get(download_url, headers={"User-Agent": "Mozilla/5.0"}, timeout=self.timeout_seconds)
-        except requests.RequestException:
-            return None
-        if rr.status_code != 200:
-            return None
-        return rr.text
-
-    def _fetch_via_raw_fallback(self, ref: RepoRef) -> Optional[str]:
+    def _fetch_via_raw_fallback(self, ref: RepoRef, max_chars: int) -> Optional[str]:
         branches = ["main", "master"]
         filenames = ["README.md", "README.MD", "README.rst", "README.txt", "README"]
 
         for branch in branches:
             for filename in filenames:
-                raw_url = f"https://raw.githubusercontent.com/{ref.owner}/{ref.repo}/{branch}/{filename}"
-                try:
-                    r = requests.get(raw_url, headers={"User-Agent": "Mozilla/5.0"}, timeout=self.timeout_seconds)
-                except requests.RequestException:
-                    continue
-                if r.status_code == 200 and r.text.strip():
-                    return r.text
+                raw_url = f"{self.raw_base_url}/{ref.owner}/{ref.repo}/{branch}/{filename}"
+                text = self._download_text(raw_url, max_chars)
+                if text and text.strip():
+                    return text
         return None
 
+    def _download_text(
+        self,
+        url: str,
+        max_chars: int,
+        headers: Optional[dict] = None,
+        api: bool = False,
+    ) -> Optional[str]:
+        """
+        Stream a text body, normalizing CRLF, and stop reading as soon as
+        `max_chars` characters (or MAX_README_BYTES bytes) have arrived.
+        With api=True, a GitHub rate-limit response raises _RateLimited.
+        """
+        try:
+            r = self.http.get(
+                url,
+                headers=headers or {"User-Agent": "Mozilla/5.0"},
+                timeout=self.timeout_seconds,
+                stream=True,
+            )
+        except requests.RequestException:
+            return None
+
+        with r:
+            limited = rate_limit_message(r, self.token) if api else None
+            if limited:
+                raise _RateLimited(limited)
+            if r.status_code != 200:
+                return None
+            # requests assumes ISO-8859-1 for text/* without a charset; READMEs are UTF-8.
+            content_type = r.headers.get("Content-Type", "").lower()
+            encoding = r.encoding if "charset" in content_type and r.encoding else "utf-8"
+            try:
+                decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+            except LookupError:
+                decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+            parts = []
+            chars = 0
+            read = 0
+            pending_cr = False
+            try:
+                for chunk in r.iter_content(chunk_size=CHUNK_SIZE):
+                    read += len(chunk)
+                    piece = decoder.decode(chunk)
+                    if pending_cr:
+                        piece = "\r" + piece
+                    # Hold back a trailing CR in case its LF is in the next chunk.
+                    pending_cr = piece.endswith("\r")
+                    if pending_cr:
+                        piece = piece[:-1]
+                    piece = piece.replace("\r\n", "\n")
+                    parts.append(piece)
+                    chars += len(piece)
+                    if (max_chars > 0 and chars >= max_chars) or read >= MAX_README_BYTES:
+                        break
+                else:
+                    tail = ("\r" if pending_cr else "") + decoder.decode(b"", final=True)
+                    parts.append(tail.replace("\r\n", "\n"))
+            except requests.RequestException:
+                return None
+
+        text = "".join(parts)
+        if max_chars > 0:
+            return text[:max_chars]
+        return text
+
@@ -2,10 +2,32 @@
 from __future__ import annotations
 
 import json
+import math
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Iterable, List
 
+from .ai_service import AIServiceError
 from .fetch_service import TrendingRepo
+from .json_parser import loads_tolerant
+
+
+SELECTION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "picks": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"id": {"type": "integer"}, "reason": {"type": "string"}},
+                "required": ["id", "reason"],
+                "additionalProperties": False,
+            },
+        }
+    },
+    "required": ["picks"],
+    "additionalProperties": False,
+}
 
 
 class SelectorServiceError(RuntimeError):
@@ -20,21 +42,81 @@ class SelectedRepo:
 
 
 class SelectorService:
-    def __init__(self, ai_client) -> None:
+    def __init__(self, ai_client, chunk_size: int = 40, max_workers: int = 4, retries: int = 1) -> None:
         """
-        ai_client must expose: generate_text(prompt: str) -> str
+        ai_client must expose: generate_text(prompt: str, json_schema: Optional[dict] = None) -> str
         This keeps selector decoupled from the specific AI provider.
+
+        Pools larger than `chunk_size` are selected tournament-style: chunks
+        are judged concurrently (up to `max_workers` at once) and their
+        winners go to the next round. chunk_size <= 0 disables this, and it is
+        skipped when the pick itself is at least `chunk_size`.
+        Unparseable responses get up to `retries` short repair prompts.
         """
         self.ai_client = ai_client
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.retries = retries
 
     def select_top_repos(self, repos: Iterable[TrendingRepo], limit: int = 4) -> List[SelectedRepo]:
         repo_list = list(repos)
         if not repo_list:
             return []
 
-        prompt = self._build_prompt(repo_list, limit=limit)
-        raw = self.ai_client.generate_text(prompt)
-        return self._parse_response(raw, repo_list, limit=limit)
+        # A tournament only helps when the final pick fits in one chunk.
+        if 0 < limit < self.chunk_size < len(repo_list):
+            repo_list = self._tournament(repo_list, limit=limit)
+        return self._select_once(repo_list, limit=limit)
+
+    def _select_once(self, repos: List[TrendingRepo], limit: int) -> List[SelectedRepo]:
+        prompt = self._build_prompt(repos, limit=limit)
+        for attempt in range(self.retries + 1):
+            raw = self.ai_client.generate_text(prompt, json_schema=SELECTION_SCHEMA)
+            try:
+                return self._parse_response(raw, repos, limit=limit)
+            except SelectorServiceError as exc:
+                if attempt == self.retries:
+                    raise
+                # Re-sending the whole repo list costs far more than fixing the reply.
+                prompt = self._build_repair_prompt(raw, str(exc), limit=limit)
+        return []
+
+    def _tournament(self, repos: List[TrendingRepo], limit: int) -> List[TrendingRepo]:
+        """Reduce a large pool round by round until it fits in one final prompt."""
+        pool = repos
+        while len(pool) > self.chunk_size:
+            chunks = [pool[i : i + self.chunk_size] for i in range(0, len(pool), self.chunk_size)]
+            # Halve the pool each round, but keep enough winners for the final pick.
+            per_chunk = max(min(limit, self.chunk_size // 2), math.ceil(limit / len(chunks)), 1)
+            # Check before paying for a round: a small trailing chunk can
+            # leave too few winners, or the round may not shrink the pool.
+            expected = sum(min(per_chunk, len(chunk)) for chunk in chunks)
+            if expected < limit or expected >= len(pool):
+                break
+            with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(chunks)))) as executor:
+                rounds = list(executor.map(lambda chunk: self._chunk_winners(chunk, per_chunk), chunks))
+            winners = [repo for chunk_winners in rounds for repo in chunk_winners]
+            # The model may still return fewer picks than asked for.
+            if len(winners) < limit:
+                break
+            pool = winners
+        return pool
+
+    def _chunk_winners(self, chunk: List[TrendingRepo], limit: int) -> List[TrendingRepo]:
+        if len(chunk) <= limit:
+            # Nothing to choose between; skip the AI call.
+            return list(chunk)
+        try:
+            picked = self._select_once(chunk, limit=limit)
+        except (SelectorServiceError, AIServiceError):
+            picked = []
+        by_name = {repo.name: repo for repo in chunk}
+        winners = [by_name[p.name] for p in picked if p.name in by_name]
+        if not winners:
+            # One bad chunk should not sink the whole selection: fall back to
+            # the chunk's own momentum ordering.
+            winners = sorted(chunk, key=lambda r: r.stars_today, reverse=True)[:limit]
+        return winners
 
     @staticmethod
     def _build_prompt(repos: List[TrendingRepo], limit: int) -> str:
@@ -56,43 +138,48 @@ class SelectorService:
         return (
             "You are selecting GitHub repositories for tweeting.\n"
             f"Pick the top {limit} that are most interesting or newsworthy.\n"
-            "Return ONLY valid JSON array with objects: {id, reason}.\n"
+            'Return ONLY valid JSON: {"picks": [{"id": <repo id>, "reason": "<why>"}]}.\n'
             "No extra text.\n\n"
             f"Repos JSON:\n{payload}\n"
         )
 
+    @staticmethod
+    def _build_repair_prompt(raw: str, problem: str, limit: int) -> str:
+        return (
+            f"Your previous reply could not be used: {problem}\n"
+            f"Rewrite it as the top {limit} picks. Keep the same ids and reasons.\n"
+            'Return ONLY valid JSON: {"picks": [{"id": <repo id>, "reason": "<why>"}]}.\n'
+            "No extra text.\n\n"
+            f"Previous reply:\n{raw[:4000]}\n"
+        )
+
     @staticmethod
     def _parse_response(raw: str, repos: List[TrendingRepo], limit: int) -> List[SelectedRepo]:
-        raw = raw.strip()
-        data = None
         try:
-            data = json.loads(raw)
-        except json.JSONDecodeError:
-            # Common failure mode: model wraps JSON with prose or code fences.
-            start = raw.find("[")
-            end = raw.rfind("]")
-            if start != -1 and end != -1 and end > start:
-                try:
-                    data = json.loads(raw[start : end + 1])
-                except json.JSONDecodeError as exc:
-                    raise SelectorServiceError("AI response was not valid JSON.") from exc
-            else:
-                raise SelectorServiceError("AI response was not valid JSON.")
+            data = loads_tolerant(raw)
+        except ValueError as exc:
+            raise SelectorServiceError("AI response was not valid JSON.") from exc
 
+        if isinstance(data, dict):
+            data = data.get("picks")
         if not isinstance(data, list):
-            raise SelectorServiceError("AI response JSON must be a list.")
+            raise SelectorServiceError("AI response JSON must be a list of picks.")
 
         selected: List[SelectedRepo] = []
         for item in data[:limit]:
             if not isinstance(item, dict):
                 continue
             repo_id = item.get("id")
-            reason = item.get("reason", "").strip()
-            if not isinstance(repo_id, int):
+            reason = str(item.get("reason") or "").strip()
+            if isinstance(repo_id, str) and repo_id.strip().isdigit():
+                repo_id = int(repo_id)
+            if not isinstance(repo_id, int) or isinstance(repo_id, bool):
                 continue
             if repo_id < 1 or repo_id > len(repos):
                 continue
             repo = repos[repo_id - 1]
             selected.append(SelectedRepo(name=repo.name, url=repo.url, reason=reason or "-"))
 
+        if not selected:
+            raise SelectorServiceError(f"AI response picked no valid repo ids (expected 1-{len(repos)}).")
         return selected
@@ -0,0 +1,313 @@
+"""Local HTTP API (`itweet serve`) with shared warm caches and a worker pool."""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .ai_service import AIServiceError
+from .fetch_service import FetchService, FetchServiceError
+from .prompt_service import PromptService, TweetRequest, normalize_output_language
+from .readme_service import ReadmeService, ReadmeServiceError
+from .selector_service import SelectorService, SelectorServiceError
+from .tweet_validator import TweetValidator
+
+
+logger = logging.getLogger(__name__)
+
+TRENDING_TTL_SECONDS = 600
+REPO_TTL_SECONDS = 3600
+# READMEs can be up to 1 MB each, so the result cache is bounded (LRU).
+CACHE_MAX_ENTRIES = 256
+
+
+class ServerBusyError(RuntimeError):
+    pass
+
+
+class BadRequestError(ValueError):
+    pass
+
+
+def pooled_session(workers: int) -> requests.Session:
+    """A requests.Session that keeps up to `workers` connections per host alive."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=max(10, workers))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class Coalescer:
+    """
+    Runs work on a bounded pool. Concurrent calls with the same key share one
+    execution, and results can be kept for `ttl` seconds in an LRU cache of
+    at most `max_entries` results.
+    """
+
+    def __init__(self, workers: int, max_pending: int, max_entries: int = CACHE_MAX_ENTRIES) -> None:
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="itweet-worker")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        # Re-entrant: a future that is already done runs its callback inline.
+        self._lock = threading.RLock()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._cache: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.max_entries = max_entries
+
+    def run(self, key: Hashable, fn: Callable[[], Any], ttl: float = 0, timeout: Optional[float] = None) -> Any:
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached:
+                if cached[0] > time.monotonic():
+                    self._cache.move_to_end(key)
+                    return cached[1]
+                del self._cache[key]
+            future = self._inflight.get(key)
+            if future is None:
+                if not self._slots.acquire(blocking=False):
+                    raise ServerBusyError("Too many requests in progress.")
+                future = self.pool.submit(fn)
+                self._inflight[key] = future
+                future.add_done_callback(lambda f: self._finish(key, f, ttl))
+        return future.result(timeout=timeout)
+
+    def _finish(self, key: Hashable, future: Future, ttl: float) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+            if ttl > 0 and not future.cancelled() and future.exception() is None:
+                self._store(key, future.result(), ttl)
+        self._slots.release()
+
+    def _store(self, key: Hashable, value: Any, ttl: float) -> None:
+        now = time.monotonic()
+        self._cache[key] = (now + ttl, value)
+        self._cache.move_to_end(key)
+        for stale in [k for k, (expires, _) in self._cache.items() if expires <= now]:
+            del self._cache[stale]
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def shutdown(self) -> None:
+        self.pool.shutdown(wait=False)
+
+
+class DraftServer:
+    def __init__(
+        self,
+        ai_client,
+        workers: int = 8,
+        request_timeout: float = 180,
+        fetch_service: Optional[FetchService] = None,
+        readme_service: Optional[ReadmeService] = None,
+        session: Optional[requests.Session] = None,
+    ) -> None:
+        """
+        ai_client must expose:
+            generate_text(prompt: str, system: Optional[str] = None, json_schema: Optional[dict] = None) -> str
+
+        By default GitHub calls share one pooled requests.Session sized for
+        `workers` concurrent connections. Pass the same `session` to the
+        AIService to pool OpenRouter connections too.
+        """
+        session = session or pooled_session(workers)
+
+        self.ai_client = ai_client
+        self.fetch_service = fetch_service or FetchService(session=session)
+        self.readme_service = readme_service or ReadmeService(session=session)
+        self.prompt_service = PromptService()
+        self.selector = SelectorService(ai_client)
+        self.request_timeout = request_timeout
+        self.work = Coalescer(workers=workers, max_pending=workers * 4)
+
+    def trending(self, since: str = "daily", language: Optional[str] = None):
+        key = ("trending", since.lower(), (language or "").lower())
+        return self.work.run(
+            key,
+            lambda: self.fetch_service.fetch_github_trending(since=since, language=language),
+            ttl=TRENDING_TTL_SECONDS,
+            timeout=self.request_timeout,
+        )
+
+    def select(self, since: str = "daily", language: Optional[str] = None, limit: int = 25, pick: int = 4):
+        repos = self.trending(since=since, language=language)[: max(1, limit)]
+        pick = max(1, min(pick, len(repos))) if repos else 0
+        if not repos:
+            return []
+        key = ("select", since.lower(), (language or "").lower(), limit, pick)
+        return self.work.run(
+            key,
+            lambda: self.selector.select_top_repos(repos, limit=pick),
+            timeout=self.request_timeout,
+        )
+
+    def draft(
+        self,
+        repo_url: str,
+        tweet_language: str = "English",
+        tone: str = "informative",
+        max_chars: int = 280,
+        thread: bool = False,
+        readme_chars: int = 6000,
+    ) -> Dict[str, Any]:
+        repo = self.work.run(
+            ("repo", repo_url),
+            lambda: self.fetch_service.fetch_repo(repo_url),
+            ttl=REPO_TTL_SECONDS,
+            timeout=self.request_timeout,
+        )
+        try:
+            readme_text = self.work.run(
+                ("readme", repo.url, readme_chars),
+                lambda: self.readme_service.fetch_readme(repo.url, max_chars=readme_chars),
+                ttl=REPO_TTL_SECONDS,
+                timeout=self.request_timeout,
+            )
+        except ReadmeServiceError:
+            readme_text = ""
+
+        req = TweetRequest(
+            repo_name=repo.name,
+            repo_url=repo.url,
+            description=repo.description,
+            language=repo.language,
+            stars=repo.stars,
+            stars_today=repo.stars_today,
+            readme_text=readme_text,
+            output_language=tweet_language,
+            tone=tone,
+            max_chars=max_chars,
+            thread=thread,
+        )
+
+        def generate():
+            system, prompt = self.prompt_service.build_tweet_messages(req)
+            validator = TweetValidator(max_chars=max_chars)
+            return validator.generate(self.ai_client, system, prompt, thread=thread)
+
+        key = ("draft", repo.url, tweet_language, tone, max_chars, thread, readme_chars)
+        check = self.work.run(key, generate, timeout=self.request_timeout)
+        return {
+            "repo": repo.name,
+            "url": repo.url,
+            "draft": check.as_text(thread),
+            "tweets": check.tweets,
+            "valid": check.valid,
+            "errors": check.errors,
+        }
+
+    def make_http_server(self, host: str = "127.0.0.1", port: int = 8787) -> ThreadingHTTPServer:
+        app = self
+
+        class Handler(BaseHTTPRequestHandler):
+            server_version = "iTweet"
+
+            def log_message(self, *_):
+                pass
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                query = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+                if parsed.path == "/health":
+                    self._dispatch(lambda: {"status": "ok"})
+                elif parsed.path == "/trending":
+                    self._dispatch(
+                        lambda: [
+                            asdict(r)
+                            for r in app.trending(since=query.get("since", "daily"), language=query.get("lang"))
+                        ]
+                    )
+                else:
+                    self._reply(404, {"error": "Not found."})
+
+            def do_POST(self):
+                path = urlparse(self.path).path
+                if path == "/select":
+                    self._dispatch(lambda: [asdict(r) for r in app.select(**_select_args(self._body()))])
+                elif path == "/draft":
+                    self._dispatch(lambda: app.draft(**_draft_args(self._body())))
+                else:
+                    self._reply(404, {"error": "Not found."})
+
+            def _body(self) -> Dict[str, Any]:
+                try:
+                    length = int(self.headers.get("Content-Length") or 0)
+                except ValueError as exc:
+                    raise BadRequestError("Invalid Content-Length.") from exc
+                if not length:
+                    return {}
+                try:
+                    data = json.loads(self.rfile.read(length).decode("utf-8"))
+                except ValueError as exc:
+                    raise BadRequestError("Request body must be JSON.") from exc
+                if not isinstance(data, dict):
+                    raise BadRequestError("Request body must be a JSON object.")
+                return data
+
+            def _dispatch(self, fn: Callable[[], Any]) -> None:
+                try:
+                    self._reply(200, fn())
+                except BadRequestError as exc:
+                    self._reply(400, {"error": str(exc)})
+                except ServerBusyError as exc:
+                    self._reply(503, {"error": str(exc)})
+                except (FetchServiceError, SelectorServiceError, AIServiceError) as exc:
+                    self._reply(502, {"error": str(exc)})
+                except (FutureTimeoutError, TimeoutError):
+                    self._reply(504, {"error": "Timed out."})
+                except Exception:
+                    logger.exception("Unhandled error serving %s %s", self.command, self.path)
+                    self._reply(500, {"error": "Internal server error."})
+
+            def _reply(self, status: int, payload: Any) -> None:
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        return server
+
+
+def _select_args(body: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        return {
+            "since": str(body.get("since", "daily")),
+            "language": body.get("lang"),
+            "limit": int(body.get("limit", 25)),
+            "pick": int(body.get("pick", 4)),
+        }
+    except (TypeError, ValueError) as exc:
+        raise BadRequestError(f"Invalid parameter: {exc}") from exc
+
+
+def _draft_args(body: Dict[str, Any]) -> Dict[str, Any]:
+    repo_url = body.get("url") or body.get("repo")
+    if not repo_url or not isinstance(repo_url, str):
+        raise BadRequestError("Missing 'url' (GitHub repo URL or owner/repo).")
+    if "://" not in repo_url:
+        repo_url = f"https://github.com/{repo_url.strip('/')}"
+    try:
+        return {
+            "repo_url": repo_url.rstrip("/"),
+            "tweet_language": normalize_output_language(str(body.get("lang", "English"))),
+            "tone": str(body.get("tone", "informative")),
+            "max_chars": int(body.get("max_chars", 280)),
+            "thread": bool(body.get("thread", False)),
+            "readme_chars": int(body.get("readme_chars", 6000)),
+        }
+    except (TypeError, ValueError) as exc:
+        raise BadRequestError(f"Invalid parameter: {exc}") from exc
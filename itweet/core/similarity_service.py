@@ -0,0 +1,193 @@
+"""Persistent near-duplicate index for repos and generated drafts (SimHash)."""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .fetch_service import TrendingRepo
+
+
+DEFAULT_INDEX_PATH = os.path.expanduser("~/.itweet/similarity.json")
+
+HASH_BITS = 64
+# Four 16-bit bands: by pigeonhole, two hashes within Hamming distance 3 share
+# at least one band exactly, so lookups only scan a handful of bucket entries.
+BANDS = 4
+BAND_BITS = HASH_BITS // BANDS
+MAX_DISTANCE = BANDS - 1
+# Signatures of very short texts are too noisy to compare.
+MIN_TOKENS = 4
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class SimilarityServiceError(RuntimeError):
+    pass
+
+
+@dataclass
+class SimilarityMatch:
+    kind: str
+    key: str
+    distance: int
+
+
+def simhash(text: str) -> Optional[int]:
+    """64-bit SimHash over word unigrams and bigrams; None if text is too short."""
+    tokens = [t.lower() for t in _TOKEN_RE.findall(text or "")]
+    if len(tokens) < MIN_TOKENS:
+        return None
+
+    weights: Dict[str, int] = {}
+    for token in tokens:
+        weights[token] = weights.get(token, 0) + 1
+    for a, b in zip(tokens, tokens[1:]):
+        feature = f"{a} {b}"
+        weights[feature] = weights.get(feature, 0) + 1
+
+    vector = [0] * HASH_BITS
+    for feature, weight in weights.items():
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+        for bit in range(HASH_BITS):
+            if h >> bit & 1:
+                vector[bit] += weight
+            else:
+                vector[bit] -= weight
+
+    value = 0
+    for bit, score in enumerate(vector):
+        if score > 0:
+            value |= 1 << bit
+    return value
+
+
+def readme_head(text: str, max_chars: int = 1000) -> str:
+    return (text or "")[:max_chars]
+
+
+class SimilarityService:
+    def __init__(self, index_path: Optional[str] = None, window_days: int = 30) -> None:
+        """
+        Args:
+            index_path: JSON file backing the index.
+            window_days: Ignore entries older than this (0 = never expire).
+        """
+        self.index_path = index_path or DEFAULT_INDEX_PATH
+        self.window_days = window_days
+        self._entries: List[dict] = []
+        self._buckets: Dict[Tuple[str, int, int], List[int]] = {}
+        self._names: Dict[str, float] = {}
+        self._dirty = False
+        self._load()
+
+    def seen_repo(self, repo: TrendingRepo) -> Optional[SimilarityMatch]:
+        """Return a match if this repo, or one with a near-identical description, was used before."""
+        ts = self._names.get(repo.name.lower())
+        if ts is not None and self._fresh(ts):
+            return SimilarityMatch(kind="repo", key=repo.name, distance=0)
+        return self.find("repo", repo.description)
+
+    def filter_repos(self, repos: Iterable[TrendingRepo]) -> Tuple[List[TrendingRepo], List[TrendingRepo]]:
+        """Split repos into (new, already seen)."""
+        fresh: List[TrendingRepo] = []
+        seen: List[TrendingRepo] = []
+        for repo in repos:
+            (seen if self.seen_repo(repo) else fresh).append(repo)
+        return fresh, seen
+
+    def find(self, kind: str, text: str) -> Optional[SimilarityMatch]:
+        """Return the closest entry of `kind` within MAX_DISTANCE bits, if any."""
+        value = simhash(text)
+        if value is None:
+            return None
+
+        best: Optional[SimilarityMatch] = None
+        checked: Set[int] = set()
+        for band, band_value in self._bands(value):
+            for idx in self._buckets.get((kind, band, band_value), ()):
+                if idx in checked:
+                    continue
+                checked.add(idx)
+                entry = self._entries[idx]
+                if not self._fresh(entry["ts"]):
+                    continue
+                distance = bin(value ^ entry["hash"]).count("1")
+                if distance <= MAX_DISTANCE and (best is None or distance < best.distance):
+                    best = SimilarityMatch(kind=kind, key=entry["key"], distance=distance)
+        return best
+
+    def add_repo(self, repo: TrendingRepo, readme_text: str = "") -> None:
+        now = time.time()
+        self._names[repo.name.lower()] = now
+        self._add("repo", repo.name, repo.description, now)
+        if readme_text:
+            self._add("readme", repo.name, readme_head(readme_text), now)
+        self._dirty = True
+
+    def add_draft(self, key: str, draft: str) -> None:
+        self._add("draft", key, draft, time.time())
+        self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        payload = {
+            "version": 1,
+            "names": self._names,
+            "entries": self._entries,
+        }
+        directory = os.path.dirname(self.index_path)
+        tmp_path = f"{self.index_path}.tmp"
+        try:
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, self.index_path)
+        except OSError as exc:
+            raise SimilarityServiceError(f"Failed to save similarity index: {exc}") from exc
+        self._dirty = False
+
+    def _add(self, kind: str, key: str, text: str, ts: float) -> None:
+        value = simhash(text)
+        if value is None:
+            return
+        self._entries.append({"kind": kind, "key": key, "hash": value, "ts": ts})
+        self._index(len(self._entries) - 1)
+
+    def _index(self, idx: int) -> None:
+        entry = self._entries[idx]
+        for band, band_value in self._bands(entry["hash"]):
+            self._buckets.setdefault((entry["kind"], band, band_value), []).append(idx)
+
+    def _load(self) -> None:
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        self._names = dict(data.get("names", {}))
+        # Drop expired entries on load so the index does not grow forever.
+        self._entries = [e for e in data.get("entries", []) if self._fresh(e.get("ts", 0))]
+        self._names = {k: v for k, v in self._names.items() if self._fresh(v)}
+        for idx in range(len(self._entries)):
+            self._index(idx)
+
+    def _fresh(self, ts: float) -> bool:
+        if self.window_days <= 0:
+            return True
+        return time.time() - ts <= self.window_days * 86400
+
+    @staticmethod
+    def _bands(value: int):
+        mask = (1 << BAND_BITS) - 1
+        for band in range(BANDS):
+            yield band, (value >> (band * BAND_BITS)) & mask
@@ -0,0 +1,201 @@
+"""Post-generation validation and local repair of tweet drafts."""
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from .json_parser import loads_tolerant
+
+
+URL_WEIGHT = 23
+MIN_BULLETS = 2
+# A bullet cut shorter than this is noise; ask the model instead.
+MIN_BULLET_WORDS = 3
+
+# twitter-text v3: code points in these ranges count 1, everything else counts 2.
+_LIGHT_RANGES = (
+    (0x0000, 0x10FF),
+    (0x2000, 0x200D),
+    (0x2010, 0x201F),
+    (0x2032, 0x2037),
+)
+_URL_RE = re.compile(r"(?:https?://|www\.)[^\s<>\"]+", re.IGNORECASE)
+_ELLIPSIS = "…"
+
+THREAD_SCHEMA = {
+    "type": "object",
+    "properties": {"tweets": {"type": "array", "items": {"type": "string"}}},
+    "required": ["tweets"],
+    "additionalProperties": False,
+}
+
+
+@dataclass
+class ValidationResult:
+    tweets: List[str]
+    valid: bool
+    repaired: bool = False
+    errors: List[str] = field(default_factory=list)
+
+    def as_text(self, thread: bool) -> str:
+        if thread:
+            return json.dumps(self.tweets, ensure_ascii=False, indent=2)
+        return self.tweets[0] if self.tweets else ""
+
+
+def weighted_length(text: str) -> int:
+    """Tweet length as Twitter counts it: URLs are 23, CJK and emoji count 2."""
+    total = 0
+    last = 0
+    for match in _URL_RE.finditer(text):
+        total += _char_weight(text[last : match.start()]) + URL_WEIGHT
+        last = match.end()
+    return total + _char_weight(text[last:])
+
+
+def _char_weight(text: str) -> int:
+    total = 0
+    for ch in text:
+        cp = ord(ch)
+        total += 1 if any(lo <= cp <= hi for lo, hi in _LIGHT_RANGES) else 2
+    return total
+
+
+class TweetValidator:
+    def __init__(self, max_chars: int = 280) -> None:
+        self.max_chars = max_chars
+        self.local_repairs = 0
+        self.regenerations = 0
+
+    def validate(self, raw: str, thread: bool = False) -> ValidationResult:
+        """
+        Parse and length-check a draft, trimming `> ` bullets to fit if needed.
+        """
+        if thread:
+            tweets = self._parse_thread(raw)
+            if tweets is None:
+                return ValidationResult(
+                    tweets=[raw.strip()],
+                    valid=False,
+                    errors=["Thread is not a JSON array of strings."],
+                )
+        else:
+            tweets = [raw.strip()]
+
+        result = ValidationResult(tweets=[], valid=True)
+        for idx, tweet in enumerate(tweets, start=1):
+            if weighted_length(tweet) <= self.max_chars:
+                result.tweets.append(tweet)
+                continue
+            fixed = self._trim(tweet)
+            if fixed is None:
+                result.valid = False
+                result.tweets.append(tweet)
+                result.errors.append(f"Tweet {idx} is {weighted_length(tweet)} chars (max {self.max_chars}).")
+            else:
+                result.repaired = True
+                result.tweets.append(fixed)
+
+        if result.repaired:
+            self.local_repairs += 1
+        return result
+
+    def generate(self, ai_client, system: str, prompt: str, thread: bool = False) -> ValidationResult:
+        """
+        Generate a draft and validate it. Threads are requested against
+        THREAD_SCHEMA so providers with structured outputs return clean JSON.
+
+        ai_client must expose:
+            generate_text(prompt: str, system: Optional[str] = None, json_schema: Optional[dict] = None) -> str
+        """
+        schema = THREAD_SCHEMA if thread else None
+        raw = ai_client.generate_text(prompt, system=system, json_schema=schema)
+        return self.ensure_valid(ai_client, raw, thread=thread)
+
+    def ensure_valid(self, ai_client, raw: str, thread: bool = False, max_retries: int = 1) -> ValidationResult:
+        """
+        Validate a draft; if local repair is not enough, send a short repair
+        prompt (not the full generation prompt) up to `max_retries` times.
+
+        ai_client must expose: generate_text(prompt: str, json_schema: Optional[dict] = None) -> str
+        """
+        result = self.validate(raw, thread=thread)
+        schema = THREAD_SCHEMA if thread else None
+        for _ in range(max_retries):
+            if result.valid:
+                break
+            self.regenerations += 1
+            raw = ai_client.generate_text(self.build_repair_prompt(result, thread=thread), json_schema=schema)
+            result = self.validate(raw, thread=thread)
+        return result
+
+    def build_repair_prompt(self, result: ValidationResult, thread: bool = False) -> str:
+        problems = "\n".join(f"- {e}" for e in result.errors)
+        if thread:
+            body = json.dumps(result.tweets, ensure_ascii=False)
+            output = "Output ONLY a JSON array of strings, one string per tweet. No extra text."
+        else:
+            body = result.tweets[0] if result.tweets else ""
+            output = "Output ONLY the fixed tweet as plain text."
+        return (
+            "Fix the following tweet draft. Keep its language, tone, facts and GitHub link.\n"
+            f"Every tweet must be at most {self.max_chars} characters "
+            "(links count as 23, CJK characters and emojis count as 2).\n"
+            f"Problems:\n{problems}\n"
+            f"{output}\n\n"
+            f"Draft:\n{body}\n"
+        )
+
+    @staticmethod
+    def _parse_thread(raw: str) -> Optional[List[str]]:
+        try:
+            data = loads_tolerant(raw)
+        except ValueError:
+            return None
+        if isinstance(data, dict):
+            data = data.get("tweets")
+        if not isinstance(data, list) or not data:
+            return None
+        if not all(isinstance(item, str) and item.strip() for item in data):
+            return None
+        return [item.strip() for item in data]
+
+    def _trim(self, tweet: str) -> Optional[str]:
+        """
+        Deterministically shorten a tweet by working on its `> ` bullets only:
+        drop trailing bullets down to MIN_BULLETS, then cut the last bullet at
+        a word boundary. Returns None if that cannot make it fit.
+        """
+        lines = [line.rstrip() for line in tweet.split("\n")]
+        # Collapse runs of blank lines first; they count towards the limit.
+        compact: List[str] = []
+        for line in lines:
+            if not line and compact and not compact[-1]:
+                continue
+            compact.append(line)
+        lines = compact
+
+        def fits(candidate: List[str]) -> bool:
+            return weighted_length("\n".join(candidate).strip()) <= self.max_chars
+
+        if fits(lines):
+            return "\n".join(lines).strip()
+
+        bullets = [i for i, line in enumerate(lines) if line.startswith("> ")]
+        while len(bullets) > MIN_BULLETS:
+            del lines[bullets.pop()]
+            if fits(lines):
+                return "\n".join(lines).strip()
+
+        if not bullets:
+            return None
+        last = bullets[-1]
+        words = lines[last][2:].split(" ")
+        while len(words) > MIN_BULLET_WORDS:
+            words.pop()
+            lines[last] = "> " + " ".join(words).rstrip(",;:.-") + _ELLIPSIS
+            if fits(lines):
+                return "\n".join(lines).strip()
+        return None
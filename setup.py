@@ -24,6 +24,9 @@ setup(
         "beautifulsoup4>=4.12.0",
         "click>=8.1.7",
     ],
+    extras_require={
+        "history": ["numpy>=1.21"],
+    },
     entry_points={
         "console_scripts": [
             "itweet=itweet.cli:main",